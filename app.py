@@ -12,19 +12,87 @@ try:
 except ImportError:
     pass  # python-dotenv not installed
 
+import asyncio
+import atexit
+import copy
+import functools
+import gzip
+import hashlib
+import importlib
+import io
 import json
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 import requests
-from flask import Flask, request, jsonify, render_template_string
-from werkzeug.utils import secure_filename
-import tempfile
-from typing import Dict, List, Optional
-from dataclasses import dataclass, asdict
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from flask import Flask, Response, abort, request, jsonify, stream_with_context
+from flask.json.provider import DefaultJSONProvider
+from werkzeug.exceptions import HTTPException
+from typing import Dict, List, Optional, Union
+from services.cache import TTLCache, get_cache
+from services.embeddings import get_embedder
+from services.json_stream import read_streamed_json
+from dataclasses import dataclass
 import time
 
+# Optional faster / more lenient JSON parsers for LLM output
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    orjson = None
+    _json_loads = json.loads
+
+# Groq request bodies go out as pre-encoded bytes
+_json_dumps = orjson.dumps if orjson is not None else (lambda obj: json.dumps(obj).encode('utf-8'))
+
+try:
+    import json5
+except ImportError:
+    json5 = None
+
+# Optional fast encoder for pipeline results (serializes dataclasses natively)
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+@functools.lru_cache(maxsize=None)
+def _optional_import(name: str):
+    """
+    Import a heavy optional dependency on first use.
+    Returns None if it is not installed; the result is cached either way, since
+    Python itself re-searches sys.path on every failed import.
+    """
+    try:
+        return importlib.import_module(name)
+    except ImportError:
+        return None
+
+def _require(name: str):
+    """Like _optional_import, but raise ImportError when the module is missing"""
+    module = _optional_import(name)
+    if module is None:
+        raise ImportError(f"{name} is not installed")
+    return module
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson, so every jsonify() is encoded in Rust"""
+    
+    def dumps(self, obj, **kwargs) -> str:
+        return orjson.dumps(obj, default=self.default, option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
 # Initialize Flask app
 app = Flask(__name__)
-app.config['MAX_CONTENT_LENGTH'] = 50 * 1024 * 1024  # 50MB max file size
-app.config['UPLOAD_FOLDER'] = tempfile.gettempdir()
+if orjson is not None:
+    app.json = OrjsonProvider(app)
+app.config['MAX_CONTENT_LENGTH'] = 25 * 1024 * 1024  # 25MB max request size (both papers); larger bodies are refused unread
 
 # Enable CORS for frontend on different port
 @app.after_request
@@ -32,12 +100,67 @@ def after_request(response):
     response.headers.add('Access-Control-Allow-Origin', '*')
     response.headers.add('Access-Control-Allow-Headers', 'Content-Type,Authorization')
     response.headers.add('Access-Control-Allow-Methods', 'GET,PUT,POST,DELETE,OPTIONS')
+    if request.path.startswith('/static/') and response.status_code == 200 and 'v' in request.args:
+        # The index page links assets with ?v=<content hash>, so those URLs never need revalidation;
+        # unversioned URLs and errors keep Flask's default (revalidate via ETag)
+        response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
     return response
 
 # Groq API Configuration
 GROQ_API_KEY = os.environ.get('GROQ_API_KEY', '')
 GROQ_API_URL = "https://api.groq.com/openai/v1/chat/completions"
 MODEL_NAME = "llama-3.3-70b-versatile"  # Fast and capable model
+GROQ_TIMEOUT = (5, 120)  # (connect, read) seconds
+GROQ_MAX_RETRIES = 5
+GROQ_MAX_CONCURRENCY = int(os.environ.get('GROQ_MAX_CONCURRENCY', '10'))  # In-flight requests per process
+
+def _groq_retry() -> Retry:
+    """
+    Exponential backoff (capped at 30s, with jitter so parallel calls don't retry
+    in lockstep) on 429/5xx and read timeouts; Retry-After is honoured when sent.
+    """
+    retry_options = dict(
+        total=GROQ_MAX_RETRIES,
+        backoff_factor=1,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=frozenset(['POST']),
+        respect_retry_after_header=True
+    )
+    try:
+        return Retry(backoff_max=30, backoff_jitter=1.0, **retry_options)
+    except TypeError:
+        return Retry(**retry_options)  # urllib3 < 2: no jitter / backoff cap options
+
+def _create_groq_session() -> requests.Session:
+    """Pooled session shared by all GroqClient instances so TLS connections are reused"""
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=16,
+        pool_maxsize=16,
+        max_retries=_groq_retry()
+    )
+    session.mount("https://", adapter)
+    return session
+
+GROQ_SESSION = _create_groq_session()
+
+# Bursts from concurrent pipeline stages queue here instead of tripping rate limits
+GROQ_SEMAPHORE = threading.BoundedSemaphore(GROQ_MAX_CONCURRENCY)
+
+# LLM response cache configuration
+LLM_CACHE_DIR = os.environ.get('LLM_CACHE_DIR', '.llm_cache')
+LLM_CACHE_TTL = 24 * 60 * 60  # 1 day
+LLM_CACHE_MAX_TEMPERATURE = 0.2  # Only cache (near-)deterministic prompts
+
+# Local sentence embeddings (optional, requires sentence-transformers)
+EMBEDDING_BATCH_SIZE = 64
+EMBEDDER_WARMUP = os.environ.get('EMBEDDER_WARMUP', '1') != '0'  # Set to 0 for workers that never embed
+FUSION_SIMILARITY_THRESHOLD = 0.78  # Cosine similarity above which two weaknesses are "shared"
+
+ANSWER_CACHE_MAX_ENTRIES = 4096  # Per @answer_cached method
+
+# Threads shared by every request for blocking work (Groq calls, PDF text, embeddings)
+WORKER_POOL_SIZE = min(32, (os.cpu_count() or 1) * 4)
 
 # ============================================================================
 # DATA STRUCTURES
@@ -74,22 +197,144 @@ class ProposedMethod:
     components: List[str]
     addresses_weaknesses: str
 
+# ============================================================================
+# LLM RESPONSE CACHE
+# ============================================================================
+
+def llm_cache_key(model: str, messages: List[Dict], temperature: float, max_tokens: int) -> str:
+    """Stable hash of everything that determines the completion"""
+    raw = json.dumps({"m": model, "msg": messages, "t": temperature, "n": max_tokens}, sort_keys=True)
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+def get_llm_cache() -> TTLCache:
+    """Process-wide on-disk cache for LLM completions (memory only if LLM_CACHE_DIR is unusable)"""
+    return get_cache('llm', ttl=LLM_CACHE_TTL, cache_dir=LLM_CACHE_DIR)
+
+# ============================================================================
+# SHARED WORKER POOL
+# ============================================================================
+
+_worker_pool = None
+_worker_pool_lock = threading.Lock()
+
+def get_worker_pool() -> ThreadPoolExecutor:
+    """Process-wide thread pool, so concurrent requests don't each spin up their own threads"""
+    global _worker_pool
+    with _worker_pool_lock:
+        if _worker_pool is None:
+            _worker_pool = ThreadPoolExecutor(max_workers=WORKER_POOL_SIZE, thread_name_prefix="pipeline")
+            atexit.register(_worker_pool.shutdown, wait=False, cancel_futures=True)
+    return _worker_pool
+
+async def run_in_pool(pool: Optional[ThreadPoolExecutor], func, *args, **kwargs):
+    """Run a blocking call on pool (the shared worker pool if None) without blocking the event loop"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(pool or get_worker_pool(), functools.partial(func, *args, **kwargs))
+
+# ============================================================================
+# LOCAL EMBEDDINGS & SEMANTIC CACHE
+# ============================================================================
+
+def warm_embedder(flask_app: Flask) -> None:
+    """
+    Load the embedding model in the background at startup, so no request pays
+    for the import and weights, and pin it on flask_app.extensions['embedder'].
+    Requests arriving mid-load wait on the lock rather than loading a second copy.
+    """
+    def load():
+        embedder = get_embedder()
+        if embedder is not None:
+            flask_app.extensions['embedder'] = embedder
+    
+    threading.Thread(target=load, name="embedder-warmup", daemon=True).start()
+
+def app_embedder():
+    """The embedder pinned by warm_embedder, loading it on first use if warm-up is off or still running"""
+    return app.extensions.get('embedder') or get_embedder()
+
+def _should_warm_embedder() -> bool:
+    if not EMBEDDER_WARMUP:
+        return False
+    # `python app.py` runs the debug reloader: only its serving child should load the model
+    if __name__ == '__main__':
+        return os.environ.get('WERKZEUG_RUN_MAIN') == 'true'
+    return True
+
+if _should_warm_embedder():
+    warm_embedder(app)
+
+def answer_cached(key_fn, max_entries: int = ANSWER_CACHE_MAX_ENTRIES):
+    """
+    Opt-in decorator for async pipeline methods: skip the LLM call when the exact
+    same input (key_fn(*args), the full text the prompt sees) was already answered.
+    In-process LRU keyed by a hash of that text.
+    """
+    def decorator(func):
+        cache = OrderedDict()
+        lock = threading.Lock()
+        
+        @functools.wraps(func)
+        async def wrapper(self, *args, **kwargs):
+            key = hashlib.sha256(key_fn(*args, **kwargs).encode('utf-8')).hexdigest()
+            with lock:
+                cached = cache.get(key)
+                if cached is not None:
+                    cache.move_to_end(key)
+            if cached is not None:
+                print(f"[DEBUG] Answer cache hit for {func.__qualname__}")
+                return copy.deepcopy(cached)
+            
+            result = await func(self, *args, **kwargs)
+            if result:
+                with lock:
+                    cache[key] = copy.deepcopy(result)
+                    if len(cache) > max_entries:
+                        cache.popitem(last=False)
+            return result
+        
+        wrapper.answer_cache = cache
+        return wrapper
+    return decorator
+
 # ============================================================================
 # GROQ API CLIENT
 # ============================================================================
 
+def _budget(input_chars: int, base: int, cap: int) -> int:
+    """
+    max_tokens sized to the prompt: ~1 token per 4 input chars on top of a
+    fixed base, capped. Oversized limits slow responses and eat rate limit.
+    """
+    return max(base, min(cap, input_chars // 4 + base))
+
 class GroqClient:
     """Client for interacting with Groq API"""
     
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, session: Optional[requests.Session] = None, cache: Optional[TTLCache] = None,
+                 pool: Optional[ThreadPoolExecutor] = None):
         self.api_key = api_key
+        self.session = session or GROQ_SESSION
+        self.cache = cache or get_llm_cache()
+        self.pool = pool
         self.headers = {
             "Authorization": f"Bearer {api_key}",
             "Content-Type": "application/json"
         }
     
-    def chat_completion(self, messages: List[Dict], temperature: float = 0.3, max_tokens: int = 2000) -> str:
-        """Make a chat completion request to Groq"""
+    def chat_completion(self, messages: List[Dict], temperature: float = 0.3, max_tokens: int = 2000,
+                        use_cache: bool = True, stop_at_json_end: bool = False) -> str:
+        """
+        Make a chat completion request to Groq.
+        With stop_at_json_end the response is streamed and the connection closed as
+        soon as the top-level JSON object is complete, skipping any trailing prose.
+        """
+        cache_key = None
+        if use_cache and self.cache and temperature <= LLM_CACHE_MAX_TEMPERATURE:
+            cache_key = llm_cache_key(MODEL_NAME, messages, temperature, max_tokens)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+        
         payload = {
             "model": MODEL_NAME,
             "messages": messages,
@@ -98,92 +343,252 @@ class GroqClient:
         }
         
         try:
-            response = requests.post(GROQ_API_URL, headers=self.headers, json=payload)
-            response.raise_for_status()
-            return response.json()['choices'][0]['message']['content']
+            with GROQ_SEMAPHORE:
+                if stop_at_json_end:
+                    content = self._stream_until_json_end(payload)
+                else:
+                    response = self.session.post(GROQ_API_URL, headers=self.headers, data=_json_dumps(payload),
+                                                 timeout=GROQ_TIMEOUT)
+                    response.raise_for_status()
+                    content = _json_loads(response.content)['choices'][0]['message']['content']
         except Exception as e:
             print(f"Groq API Error: {str(e)}")
             raise
+        
+        if cache_key:
+            self.cache.set(cache_key, content)
+        return content
+    
+    def _stream_until_json_end(self, payload: Dict) -> str:
+        """Read a streamed (SSE) completion, stopping early once the JSON object closes"""
+        with self.session.post(GROQ_API_URL, headers=self.headers, data=_json_dumps({**payload, "stream": True}),
+                               timeout=GROQ_TIMEOUT, stream=True) as response:
+            response.raise_for_status()
+            return read_streamed_json(response)
+    
+    async def achat_completion(self, messages: List[Dict], temperature: float = 0.3, max_tokens: int = 2000,
+                               **kwargs) -> str:
+        """Async variant of chat_completion so independent calls can run concurrently"""
+        return await run_in_pool(self.pool, self.chat_completion, messages, temperature, max_tokens, **kwargs)
+
+# ============================================================================
+# LLM RESPONSE PARSING
+# ============================================================================
+
+_JSON_FENCE_RE = re.compile(r"```(?:json)?\s*(\{.*\})\s*```", re.DOTALL)
+
+def _extract_json(response: str) -> Dict:
+    """
+    Parse the JSON object in an LLM response, tolerating ```json fences and surrounding prose.
+    Raises ValueError if no JSON object can be recovered.
+    """
+    response = response.strip()
+    try:
+        data = _json_loads(response)
+    except ValueError:
+        match = _JSON_FENCE_RE.search(response)
+        candidate = match.group(1) if match else response[response.find('{'):response.rfind('}') + 1]
+        try:
+            data = _json_loads(candidate)
+        except ValueError:
+            if json5 is None:
+                raise
+            # Tolerates trailing commas, single quotes and unquoted keys
+            data = json5.loads(candidate)
+    
+    if not isinstance(data, dict):
+        raise ValueError(f"Expected a JSON object, got {type(data).__name__}")
+    return data
+
+# Bullets ("-", "•", "*") or numbered items ("1." / "2)"), capturing the item text
+_BULLET_RE = re.compile(r'^\s*(?:[-•*]+|\d+[.)])\s*(.+?)\s*$')
+_EMPTY_BULLETS = {'none', 'n/a', 'not applicable'}
+
+def _parse_bullets(response: str, min_length: int = 1) -> List[str]:
+    """Collect unique bullet/numbered list items from an LLM response, in order"""
+    items = {}
+    for line in response.splitlines():
+        match = _BULLET_RE.match(line)
+        if not match:
+            continue
+        item = match.group(1)
+        if len(item) >= min_length and item.lower() not in _EMPTY_BULLETS:
+            items.setdefault(item, None)
+    return list(items)
 
 # ============================================================================
 # STEP 1: PDF PARSING (Simulated GROBID)
 # ============================================================================
 
+def _take_pages(page_texts, max_chars: Optional[int]) -> List[str]:
+    """Consume page texts lazily, stopping once max_chars have been collected"""
+    pages, total = [], 0
+    for text in page_texts:
+        pages.append(text)
+        total += len(text)
+        if max_chars is not None and total >= max_chars:
+            break
+    return pages
+
+# PDF sources are either a file path or the raw uploaded bytes
+PdfSource = Union[str, bytes]
+
+def _pdfium_page_count(pdf: PdfSource) -> int:
+    pdfium = _require('pypdfium2')
+    doc = pdfium.PdfDocument(pdf)
+    try:
+        return len(doc)
+    finally:
+        doc.close()
+
+def _pdfium_pages(pdf: PdfSource, start: int, stop: int, max_chars: Optional[int] = None) -> List[str]:
+    """Extract page texts with pypdfium2 (PDFium, native C)"""
+    pdfium = _require('pypdfium2')
+    doc = pdfium.PdfDocument(pdf)
+    try:
+        return _take_pages((doc[i].get_textpage().get_text_range() for i in range(start, stop)), max_chars)
+    finally:
+        doc.close()
+
+def _pymupdf_open(pdf: PdfSource):
+    pymupdf = _require('pymupdf')
+    if isinstance(pdf, bytes):
+        return pymupdf.open(stream=pdf, filetype="pdf")
+    return pymupdf.open(pdf)
+
+def _pymupdf_page_count(pdf: PdfSource) -> int:
+    with _pymupdf_open(pdf) as doc:
+        return doc.page_count
+
+def _pymupdf_pages(pdf: PdfSource, start: int, stop: int, max_chars: Optional[int] = None) -> List[str]:
+    """Extract page texts with PyMuPDF (MuPDF, native C)"""
+    with _pymupdf_open(pdf) as doc:
+        return _take_pages((doc[i].get_text("text") for i in range(start, stop)), max_chars)
+
+def _pypdf2_open(pdf: PdfSource):
+    return io.BytesIO(pdf) if isinstance(pdf, bytes) else open(pdf, 'rb')
+
+def _pypdf2_page_count(pdf: PdfSource) -> int:
+    PyPDF2 = _require('PyPDF2')
+    with _pypdf2_open(pdf) as file:
+        return len(PyPDF2.PdfReader(file).pages)
+
+def _pypdf2_pages(pdf: PdfSource, start: int, stop: int, max_chars: Optional[int] = None) -> List[str]:
+    """Extract page texts with PyPDF2 (pure Python, slowest)"""
+    PyPDF2 = _require('PyPDF2')
+    with _pypdf2_open(pdf) as file:
+        pdf_reader = PyPDF2.PdfReader(file)
+        return _take_pages((pdf_reader.pages[i].extract_text() or "" for i in range(start, stop)), max_chars)
+
+# (name, page_count, extract_page_range) - fastest first; later backends are
+# only tried if earlier ones are missing or fail
+PDF_BACKENDS = [
+    ('pypdfium2', _pdfium_page_count, _pdfium_pages),
+    ('PyMuPDF', _pymupdf_page_count, _pymupdf_pages),
+    ('PyPDF2', _pypdf2_page_count, _pypdf2_pages),
+]
+
+# PDFium and MuPDF are not thread-safe, and pages for both papers (and for
+# concurrent requests) are extracted on worker threads, so every backend call
+# holds this lock
+_PDF_BACKEND_LOCK = threading.Lock()
+
+# Only the first 8000 chars reach the parse prompt; keep a little headroom
+MAX_PDF_TEXT_CHARS = 12000
+
+def extract_pdf_pages(pdf: PdfSource, max_chars: Optional[int] = None) -> List[str]:
+    """Extract per-page text (from a path or in-memory bytes) using the first PDF backend that succeeds"""
+    last_error = None
+    for name, page_count, extract in PDF_BACKENDS:
+        try:
+            with _PDF_BACKEND_LOCK:
+                count = page_count(pdf)
+                print(f"[DEBUG] {name}: PDF has {count} pages")
+                return extract(pdf, 0, count, max_chars)
+        except Exception as e:
+            print(f"[DEBUG] {name} failed: {e}")
+            last_error = e
+    raise last_error
+
 class PaperParser:
     """Parse papers into structured format"""
     
-    def __init__(self, groq_client: GroqClient):
+    # Static instructions go in the system message so the provider can cache the prefix
+    SYSTEM_PROMPT = """Extract the following sections from the research paper text provided by the user. Return ONLY valid JSON.
+
+Return format:
+{
+  "title": "paper title or null",
+  "abstract": "abstract text or null",
+  "method": "methodology section or null",
+  "experiments": "experimental results section or null",
+  "limitations": "limitations/discussion section or null"
+}
+
+Rules:
+- If section not found, use null
+- Do not infer missing content
+- Extract verbatim text"""
+    
+    def __init__(self, groq_client: GroqClient, pool: Optional[ThreadPoolExecutor] = None):
         self.groq = groq_client
+        self.pool = pool
     
-    def parse_pdf(self, pdf_path: str, paper_id: str) -> ParsedPaper:
-        """
-        Parse PDF and extract structured sections
-        In production, this would use GROBID. Here we simulate with LLM extraction.
-        """
-        print(f"\n[DEBUG] Parsing PDF: {pdf_path}")
+    def _extract_text(self, pdf: PdfSource) -> str:
+        """Read raw text from a PDF path or bytes, falling back to plain text for demo files"""
         text = ""
         
-        # Read PDF content (simplified - in production use PyPDF2 or similar)
         try:
-            import PyPDF2
-            with open(pdf_path, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                print(f"[DEBUG] PDF has {len(pdf_reader.pages)} pages")
-                for i, page in enumerate(pdf_reader.pages):
-                    page_text = page.extract_text() or ""
-                    text += page_text
-                    print(f"[DEBUG] Page {i+1}: extracted {len(page_text)} chars")
+            pages = extract_pdf_pages(pdf, max_chars=MAX_PDF_TEXT_CHARS)
+            text = "\n".join(pages)
+            print(f"[DEBUG] Read {len(pages)} pages before reaching the {MAX_PDF_TEXT_CHARS} char budget")
             print(f"[DEBUG] Total extracted text: {len(text)} chars")
         except Exception as e:
-            print(f"[DEBUG] PyPDF2 failed: {e}, trying as text file...")
+            print(f"[DEBUG] PDF extraction failed: {e}, trying as text file...")
             # Fallback: treat as text file for demo
             try:
-                with open(pdf_path, 'r', encoding='utf-8', errors='ignore') as f:
-                    text = f.read()
+                if isinstance(pdf, bytes):
+                    text = pdf[:MAX_PDF_TEXT_CHARS * 4].decode('utf-8', errors='ignore')[:MAX_PDF_TEXT_CHARS]
+                else:
+                    with open(pdf, 'r', encoding='utf-8', errors='ignore') as f:
+                        text = f.read(MAX_PDF_TEXT_CHARS)
                 print(f"[DEBUG] Read as text file: {len(text)} chars")
             except Exception as e2:
                 print(f"[DEBUG] Text file read also failed: {e2}")
         
+        return text
+    
+    async def parse_pdf(self, pdf: PdfSource, paper_id: str) -> ParsedPaper:
+        """
+        Parse PDF (a path or the raw file bytes) and extract structured sections
+        In production, this would use GROBID. Here we simulate with LLM extraction.
+        """
+        if isinstance(pdf, bytes):
+            print(f"\n[DEBUG] Parsing PDF {paper_id} from memory ({len(pdf)} bytes)")
+        else:
+            print(f"\n[DEBUG] Parsing PDF: {pdf}")
+        text = await run_in_pool(self.pool, self._extract_text, pdf)
+        
         if len(text) < 100:
             print(f"[WARNING] Very little text extracted ({len(text)} chars). PDF may be scanned/image-based.")
             print(f"[DEBUG] First 500 chars: {text[:500]}")
         
         # Extract sections using LLM
-        prompt = f"""Extract the following sections from this research paper. Return ONLY valid JSON.
-
-Paper text:
-{text[:8000]}  
-
-Return format:
-{{
-  "title": "paper title or null",
-  "abstract": "abstract text or null",
-  "method": "methodology section or null",
-  "experiments": "experimental results section or null",
-  "limitations": "limitations/discussion section or null"
-}}
-
-Rules:
-- If section not found, use null
-- Do not infer missing content
-- Extract verbatim text"""
-
-        messages = [{"role": "user", "content": prompt}]
-        response = self.groq.chat_completion(messages, temperature=0.1, max_tokens=3000)
+        paper_text = text[:8000]
+        messages = [
+            {"role": "system", "content": self.SYSTEM_PROMPT},
+            {"role": "user", "content": f"Paper text:\n{paper_text}"}
+        ]
+        response = await self.groq.achat_completion(
+            messages, temperature=0.1, max_tokens=_budget(len(paper_text), 500, 3000), stop_at_json_end=True
+        )
         
         print(f"[DEBUG] LLM response length: {len(response)} chars")
         print(f"[DEBUG] LLM response preview: {response[:300]}...")
         
         # Parse JSON response
         try:
-            # Clean response to extract JSON
-            response = response.strip()
-            if '```json' in response:
-                response = response.split('```json')[1].split('```')[0]
-            elif '```' in response:
-                response = response.split('```')[1].split('```')[0]
-            
-            data = json.loads(response)
+            data = _extract_json(response)
             print(f"[DEBUG] Parsed paper '{paper_id}':")
             print(f"  - Title: {data.get('title', 'None')[:50] if data.get('title') else 'None'}...")
             print(f"  - Abstract: {'Yes' if data.get('abstract') else 'No'} ({len(data.get('abstract') or '')} chars)")
@@ -199,7 +604,7 @@ Rules:
                 experiments=data.get('experiments'),
                 limitations=data.get('limitations')
             )
-        except json.JSONDecodeError as e:
+        except ValueError as e:
             print(f"[ERROR] JSON parse error: {e}")
             print(f"[DEBUG] Raw response: {response[:500]}")
             # Return minimal structure with abstract as fallback for method
@@ -219,10 +624,48 @@ Rules:
 class WeaknessExtractor:
     """Extract weaknesses from parsed papers"""
     
+    WEAKNESS_TYPES = """Consider these types of weaknesses:
+- Methodological limitations (small sample size, limited scope, specific assumptions)
+- Scalability concerns
+- Generalization issues (tested on limited domains/datasets)
+- Missing comparisons or baselines
+- Theoretical gaps
+- Computational/resource requirements
+- Evaluation limitations"""
+    
+    SECTIONS_SYSTEM_PROMPT = f"""You are an expert academic paper reviewer analyzing a research paper.
+
+The user will give you several sections of a research paper, each starting with a "### SECTION: <name>" header. For EACH section, identify potential weaknesses, limitations, gaps, or areas that could be improved.
+
+IMPORTANT: You MUST identify at least 2-3 potential weaknesses per section. Every research paper has limitations.
+
+{WEAKNESS_TYPES}
+
+Return ONLY valid JSON with one list of weaknesses per section, keyed by the section name:
+{{
+  "<section name>": ["weakness 1", "weakness 2"],
+  "<section name>": ["weakness 1", "weakness 2"]
+}}"""
+    
+    SECTION_SYSTEM_PROMPT = f"""You are an expert academic paper reviewer analyzing a research paper.
+
+The user will give you one section of a research paper. Identify potential weaknesses, limitations, gaps, or areas that could be improved.
+
+IMPORTANT: You MUST identify at least 2-3 potential weaknesses. Every research paper has limitations.
+
+{WEAKNESS_TYPES}
+
+Return your response as a bullet-point list:
+- [First weakness or limitation]
+- [Second weakness or limitation]
+- [Third weakness or limitation]
+
+If you truly cannot identify any weaknesses, explain why in a bullet point."""
+    
     def __init__(self, groq_client: GroqClient):
         self.groq = groq_client
     
-    def extract_from_paper(self, paper: ParsedPaper) -> PaperWeaknesses:
+    async def extract_from_paper(self, paper: ParsedPaper) -> PaperWeaknesses:
         """Extract weaknesses from all sections of a paper"""
         all_weaknesses = []
         
@@ -236,72 +679,88 @@ class WeaknessExtractor:
             'abstract': paper.abstract  # Also analyze abstract!
         }
         
-        sections_found = 0
+        to_analyze = {}
         for section_name, section_text in sections.items():
             if section_text and len(section_text) > 50:
-                sections_found += 1
                 print(f"[DEBUG] Analyzing {section_name} section ({len(section_text)} chars)...")
-                weaknesses = self._extract_from_section(section_name, section_text)
-                print(f"[DEBUG] Found {len(weaknesses)} weaknesses in {section_name}")
-                all_weaknesses.extend(weaknesses)
+                to_analyze[section_name] = section_text
             else:
                 print(f"[DEBUG] Skipping {section_name} (empty or too short)")
         
-        print(f"[DEBUG] Total sections analyzed: {sections_found}, Total weaknesses: {len(all_weaknesses)}")
+        if to_analyze:
+            # One batched call for all sections
+            by_section = await self._extract_from_sections(to_analyze)
+            if by_section is None:
+                # Fall back to one call per section, run concurrently
+                print(f"[DEBUG] Batched extraction failed, analyzing sections individually...")
+                results = await asyncio.gather(*(
+                    self._extract_from_section(name, text) for name, text in to_analyze.items()
+                ))
+                by_section = dict(zip(to_analyze, results))
+            
+            for section_name in to_analyze:
+                weaknesses = by_section.get(section_name, [])
+                print(f"[DEBUG] Found {len(weaknesses)} weaknesses in {section_name}")
+                all_weaknesses.extend(weaknesses)
+        
+        print(f"[DEBUG] Total sections analyzed: {len(to_analyze)}, Total weaknesses: {len(all_weaknesses)}")
         
         # If no weaknesses found and we have abstract, force extract from abstract
         if not all_weaknesses and paper.abstract:
             print(f"[DEBUG] No weaknesses found, forcing analysis on abstract...")
-            weaknesses = self._extract_from_section('paper_content', paper.abstract)
+            weaknesses = await self._extract_from_section('paper_content', paper.abstract)
             all_weaknesses.extend(weaknesses)
         
         return PaperWeaknesses(paper_id=paper.paper_id, weaknesses=all_weaknesses)
     
-    def _extract_from_section(self, section_name: str, text: str) -> List[str]:
+    @answer_cached(lambda sections: '\n\n'.join(f"{name}\n{text[:3000]}" for name, text in sections.items()))
+    async def _extract_from_sections(self, sections: Dict[str, str]) -> Optional[Dict[str, List[str]]]:
+        """Extract weaknesses from several sections in one call; None if the response can't be parsed"""
+        sections_text = '\n\n'.join(
+            f"### SECTION: {name}\n{text[:3000]}" for name, text in sections.items()
+        )
+        
+        messages = [
+            {"role": "system", "content": self.SECTIONS_SYSTEM_PROMPT},
+            {"role": "user", "content": sections_text}
+        ]
+        response = await self.groq.achat_completion(
+            messages, temperature=0.4, max_tokens=_budget(len(sections_text) // 2, 300, 1500), stop_at_json_end=True
+        )
+        
+        print(f"[DEBUG] Batched weakness extraction response preview: {response[:200]}...")
+        
+        try:
+            data = _extract_json(response)
+        except ValueError as e:
+            print(f"[ERROR] Batched weakness JSON parse error: {e}")
+            return None
+        
+        by_section = {}
+        for name in sections:
+            items = data.get(name) or []
+            by_section[name] = [
+                w.strip() for w in items
+                if isinstance(w, str) and w.strip() and w.strip().lower() not in ['none', 'n/a', 'not applicable']
+            ]
+        return by_section
+    
+    @answer_cached(lambda section_name, text: f"{section_name}\n{text[:3000]}")
+    async def _extract_from_section(self, section_name: str, text: str) -> List[str]:
         """Extract weaknesses from a single section"""
-        prompt = f"""You are an expert academic paper reviewer analyzing a research paper.
-
-Given the following {section_name} section of a research paper, identify potential weaknesses, limitations, gaps, or areas that could be improved.
-
-Section text:
-{text[:3000]}
-
-IMPORTANT: You MUST identify at least 2-3 potential weaknesses. Every research paper has limitations.
-
-Consider these types of weaknesses:
-- Methodological limitations (small sample size, limited scope, specific assumptions)
-- Scalability concerns
-- Generalization issues (tested on limited domains/datasets)
-- Missing comparisons or baselines
-- Theoretical gaps
-- Computational/resource requirements
-- Evaluation limitations
-
-Return your response as a bullet-point list:
-- [First weakness or limitation]
-- [Second weakness or limitation]
-- [Third weakness or limitation]
-
-If you truly cannot identify any weaknesses, explain why in a bullet point."""
-
-        messages = [{"role": "user", "content": prompt}]
-        response = self.groq.chat_completion(messages, temperature=0.4, max_tokens=1000)
+        section_text = text[:3000]
+        messages = [
+            {"role": "system", "content": self.SECTION_SYSTEM_PROMPT},
+            {"role": "user", "content": f"{section_name} section text:\n{section_text}"}
+        ]
+        response = await self.groq.achat_completion(
+            messages, temperature=0.4, max_tokens=_budget(len(section_text) // 2, 200, 1000)
+        )
         
         print(f"[DEBUG] Weakness extraction response preview: {response[:200]}...")
         
         # Parse bullet points (handle both - and • and numbered lists)
-        weaknesses = []
-        for line in response.split('\n'):
-            line = line.strip()
-            # Match bullet points, numbered lists, or asterisks
-            if line.startswith('-') or line.startswith('•') or line.startswith('*'):
-                weakness = line.lstrip('-•*').strip()
-                if weakness and weakness.lower() not in ['none', 'n/a', 'not applicable']:
-                    weaknesses.append(weakness)
-            elif len(line) > 2 and line[0].isdigit() and (line[1] == '.' or line[1] == ')'):
-                weakness = line[2:].strip()
-                if weakness and weakness.lower() not in ['none', 'n/a']:
-                    weaknesses.append(weakness)
+        weaknesses = _parse_bullets(response)
         
         print(f"[DEBUG] Parsed {len(weaknesses)} weaknesses from response")
         return weaknesses
@@ -313,20 +772,7 @@ If you truly cannot identify any weaknesses, explain why in a bullet point."""
 class WeaknessNormalizer:
     """Normalize and canonicalize weaknesses"""
     
-    def __init__(self, groq_client: GroqClient):
-        self.groq = groq_client
-    
-    def normalize(self, weaknesses: List[str]) -> List[str]:
-        """Group and canonicalize weaknesses"""
-        if not weaknesses:
-            return []
-        
-        weaknesses_text = '\n'.join(f"- {w}" for w in weaknesses)
-        
-        prompt = f"""You are an academic paper reviewer. Rephrase and consolidate the following weaknesses into clear, readable academic language.
-
-Raw weaknesses identified:
-{weaknesses_text}
+    SYSTEM_PROMPT = """You are an academic paper reviewer. Rephrase and consolidate the raw weaknesses given by the user into clear, readable academic language.
 
 Instructions:
 1. Merge similar or duplicate weaknesses
@@ -345,22 +791,30 @@ Example good format:
 - Absence of computational complexity or resource requirement analysis
 - Limited evaluation scope restricted to specific benchmark datasets
 - Insufficient discussion of algorithmic trade-offs and failure modes"""
-
-        messages = [{"role": "user", "content": prompt}]
-        response = self.groq.chat_completion(messages, temperature=0.2, max_tokens=800)
+    
+    def __init__(self, groq_client: GroqClient):
+        self.groq = groq_client
+    
+    @answer_cached(lambda weaknesses: '\n'.join(weaknesses))
+    async def normalize(self, weaknesses: List[str]) -> List[str]:
+        """Group and canonicalize weaknesses"""
+        if not weaknesses:
+            return []
+        
+        weaknesses_text = '\n'.join(f"- {w}" for w in weaknesses)
+        
+        messages = [
+            {"role": "system", "content": self.SYSTEM_PROMPT},
+            {"role": "user", "content": f"Raw weaknesses identified:\n{weaknesses_text}"}
+        ]
+        response = await self.groq.achat_completion(
+            messages, temperature=0.2, max_tokens=_budget(len(weaknesses_text), 150, 800)
+        )
         
         print(f"[DEBUG] Normalization response: {response[:200]}...")
         
         # Parse normalized weaknesses
-        normalized = []
-        for line in response.split('\n'):
-            line = line.strip()
-            if line.startswith('-') or line.startswith('•') or line.startswith('*'):
-                weakness = line.lstrip('-•*').strip()
-                if weakness and len(weakness) > 10:
-                    normalized.append(weakness)
-        
-        return normalized
+        return _parse_bullets(response, min_length=11)
 
 # ============================================================================
 # STEP 4: WEAKNESS FUSION & GAP ANALYSIS
@@ -369,48 +823,88 @@ Example good format:
 class WeaknessFusion:
     """Analyze and categorize weaknesses across papers"""
     
-    def __init__(self, groq_client: GroqClient):
-        self.groq = groq_client
-    
-    def analyze(self, weaknesses_a: List[str], weaknesses_b: List[str]) -> WeaknessAnalysis:
-        """Identify shared and unique weaknesses"""
-        prompt = f"""Compare these two lists of research paper weaknesses.
+    SYSTEM_PROMPT = """Compare the two lists of research paper weaknesses given by the user.
 Identify:
 1. Shared weaknesses (present in both)
 2. Weaknesses unique to Paper A
 3. Weaknesses unique to Paper B
 
-Paper A weaknesses:
-{chr(10).join(f"- {w}" for w in weaknesses_a)}
-
-Paper B weaknesses:
-{chr(10).join(f"- {w}" for w in weaknesses_b)}
-
 Return ONLY valid JSON:
-{{
+{
   "shared": ["weakness 1", "weakness 2"],
   "paper_a_only": ["weakness 1"],
   "paper_b_only": ["weakness 1"]
-}}"""
+}"""
+    
+    def __init__(self, groq_client: GroqClient, use_llm_fusion: bool = False):
+        self.groq = groq_client
+        self.use_llm_fusion = use_llm_fusion
+    
+    def analyze(self, weaknesses_a: List[str], weaknesses_b: List[str]) -> WeaknessAnalysis:
+        """Identify shared and unique weaknesses"""
+        if not self.use_llm_fusion:
+            embedder = app_embedder()
+            if embedder is not None:
+                return self._analyze_with_embeddings(embedder, weaknesses_a, weaknesses_b)
+        return self._analyze_with_llm(weaknesses_a, weaknesses_b)
+    
+    def _analyze_with_embeddings(self, embedder, weaknesses_a: List[str], weaknesses_b: List[str]) -> WeaknessAnalysis:
+        """Greedily pair weaknesses whose embeddings are similar enough to count as shared"""
+        if not weaknesses_a or not weaknesses_b:
+            return WeaknessAnalysis(shared=[], paper_a_only=list(weaknesses_a), paper_b_only=list(weaknesses_b))
+        
+        # Unit vectors, so the dot product is the cosine similarity
+        embeddings = embedder.encode(weaknesses_a + weaknesses_b, batch_size=EMBEDDING_BATCH_SIZE,
+                                     normalize_embeddings=True)
+        emb_a, emb_b = embeddings[:len(weaknesses_a)], embeddings[len(weaknesses_a):]
+        similarity = emb_a @ emb_b.T
+        
+        pairs = sorted(
+            ((similarity[i, j], i, j) for i in range(len(weaknesses_a)) for j in range(len(weaknesses_b))),
+            reverse=True
+        )
+        matched_a, matched_b = set(), set()
+        for score, i, j in pairs:
+            if score <= FUSION_SIMILARITY_THRESHOLD:
+                break
+            if i not in matched_a and j not in matched_b:
+                matched_a.add(i)
+                matched_b.add(j)
+        
+        print(f"[DEBUG] Embedding fusion: {len(matched_a)} shared weaknesses")
+        return WeaknessAnalysis(
+            shared=[w for i, w in enumerate(weaknesses_a) if i in matched_a],  # Keep Paper A's phrasing
+            paper_a_only=[w for i, w in enumerate(weaknesses_a) if i not in matched_a],
+            paper_b_only=[w for j, w in enumerate(weaknesses_b) if j not in matched_b]
+        )
+    
+    def _analyze_with_llm(self, weaknesses_a: List[str], weaknesses_b: List[str]) -> WeaknessAnalysis:
+        """Ask the LLM to classify shared and unique weaknesses"""
+        prompt = f"""Paper A weaknesses:
+{chr(10).join(f"- {w}" for w in weaknesses_a)}
+
+Paper B weaknesses:
+{chr(10).join(f"- {w}" for w in weaknesses_b)}"""
 
-        messages = [{"role": "user", "content": prompt}]
-        response = self.groq.chat_completion(messages, temperature=0.2, max_tokens=1500)
+        weaknesses_chars = sum(len(w) for w in weaknesses_a) + sum(len(w) for w in weaknesses_b)
+        messages = [
+            {"role": "system", "content": self.SYSTEM_PROMPT},
+            {"role": "user", "content": prompt}
+        ]
+        response = self.groq.chat_completion(
+            messages, temperature=0.2, max_tokens=_budget(weaknesses_chars, 200, 1500), stop_at_json_end=True
+        )
         
         # Parse JSON
         try:
-            response = response.strip()
-            if '```json' in response:
-                response = response.split('```json')[1].split('```')[0]
-            elif '```' in response:
-                response = response.split('```')[1].split('```')[0]
-            
-            data = json.loads(response)
+            data = _extract_json(response)
             return WeaknessAnalysis(
                 shared=data.get('shared', []),
                 paper_a_only=data.get('paper_a_only', []),
                 paper_b_only=data.get('paper_b_only', [])
             )
-        except:
+        except ValueError as e:
+            print(f"[ERROR] Failed to parse weakness fusion JSON: {e}")
             # Fallback to simple set operations
             set_a = set(weaknesses_a)
             set_b = set(weaknesses_b)
@@ -427,30 +921,9 @@ Return ONLY valid JSON:
 class MethodSynthesizer:
     """Synthesize new research methods addressing identified weaknesses"""
     
-    def __init__(self, groq_client: GroqClient):
-        self.groq = groq_client
-    
-    def synthesize(self, analysis: WeaknessAnalysis, paper_a_title: str, paper_b_title: str) -> ProposedMethod:
-        """Generate a new method addressing the weaknesses"""
-        
-        # Combine all weaknesses for context
-        all_weaknesses = analysis.shared + analysis.paper_a_only + analysis.paper_b_only
-        
-        prompt = f"""You are a senior research scientist proposing a novel method for an academic paper.
-
-=== CONTEXT ===
-Paper A: "{paper_a_title}"
-Paper B: "{paper_b_title}"
-
-=== IDENTIFIED WEAKNESSES TO ADDRESS ===
-Shared limitations (both papers):
-{chr(10).join(f"• {w}" for w in analysis.shared) if analysis.shared else "• No shared weaknesses identified"}
+    SYSTEM_PROMPT = """You are a senior research scientist proposing a novel method for an academic paper.
 
-Paper A specific limitations:
-{chr(10).join(f"• {w}" for w in analysis.paper_a_only) if analysis.paper_a_only else "• No unique weaknesses"}
-
-Paper B specific limitations:
-{chr(10).join(f"• {w}" for w in analysis.paper_b_only) if analysis.paper_b_only else "• No unique weaknesses"}
+The user will give you two papers and the weaknesses identified in them.
 
 === YOUR TASK ===
 Propose a novel hybrid method that:
@@ -465,7 +938,7 @@ Propose a novel hybrid method that:
 
 === OUTPUT FORMAT ===
 Return ONLY valid JSON:
-{{
+{
   "method_name": "Your Descriptive Method Name",
   "core_idea": "A clear 2-3 sentence description of the method's key innovation and how it works. Write in academic style.",
   "components": [
@@ -475,22 +948,45 @@ Return ONLY valid JSON:
     "Component 4: Brief description of what it does"
   ],
   "addresses_weaknesses": "A paragraph explaining specifically how this method addresses each major weakness identified above. Be concrete and reference the components."
-}}"""
+}"""
+    
+    def __init__(self, groq_client: GroqClient):
+        self.groq = groq_client
+    
+    def synthesize(self, analysis: WeaknessAnalysis, paper_a_title: str, paper_b_title: str) -> ProposedMethod:
+        """Generate a new method addressing the weaknesses"""
+        
+        # Combine all weaknesses for context
+        all_weaknesses = analysis.shared + analysis.paper_a_only + analysis.paper_b_only
+        
+        prompt = f"""=== CONTEXT ===
+Paper A: "{paper_a_title}"
+Paper B: "{paper_b_title}"
+
+=== IDENTIFIED WEAKNESSES TO ADDRESS ===
+Shared limitations (both papers):
+{chr(10).join(f"• {w}" for w in analysis.shared) if analysis.shared else "• No shared weaknesses identified"}
 
-        messages = [{"role": "user", "content": prompt}]
-        response = self.groq.chat_completion(messages, temperature=0.5, max_tokens=2500)
+Paper A specific limitations:
+{chr(10).join(f"• {w}" for w in analysis.paper_a_only) if analysis.paper_a_only else "• No unique weaknesses"}
+
+Paper B specific limitations:
+{chr(10).join(f"• {w}" for w in analysis.paper_b_only) if analysis.paper_b_only else "• No unique weaknesses"}"""
+
+        weaknesses_chars = sum(len(w) for w in all_weaknesses)
+        messages = [
+            {"role": "system", "content": self.SYSTEM_PROMPT},
+            {"role": "user", "content": prompt}
+        ]
+        response = self.groq.chat_completion(
+            messages, temperature=0.5, max_tokens=_budget(weaknesses_chars, 1000, 2500), stop_at_json_end=True
+        )
         
         print(f"[DEBUG] Method synthesis response preview: {response[:300]}...")
         
         # Parse JSON
         try:
-            response = response.strip()
-            if '```json' in response:
-                response = response.split('```json')[1].split('```')[0]
-            elif '```' in response:
-                response = response.split('```')[1].split('```')[0]
-            
-            data = json.loads(response)
+            data = _extract_json(response)
             return ProposedMethod(
                 method_name=data.get('method_name', 'Unified Adaptive Framework'),
                 core_idea=data.get('core_idea', ''),
@@ -521,41 +1017,20 @@ class ComparativeAnalyzer:
     def __init__(self, groq_client: GroqClient):
         self.groq = groq_client
     
-    def generate_comparison(self, 
-                          paper_a: ParsedPaper,
-                          paper_b: ParsedPaper,
-                          weaknesses_a: List[str],
-                          weaknesses_b: List[str],
-                          proposed: ProposedMethod) -> Dict:
-        """Generate comprehensive comparison"""
-        
-        aspects = [
-            "Task Scalability",
-            "Theoretical Foundation",
-            "Computational Efficiency",
-            "Generalization Capability",
-            "Practical Applicability"
-        ]
-        
-        prompt = f"""You are writing a comparative analysis table for an academic paper.
-
-Compare the following three approaches. Write DETAILED, READABLE assessments (not single words).
-
-=== PAPER A ===
-Title: {paper_a.title or 'Untitled Paper A'}
-Key Limitations: {'; '.join(weaknesses_a[:4]) if weaknesses_a else 'Not specified'}
-
-=== PAPER B ===
-Title: {paper_b.title or 'Untitled Paper B'}
-Key Limitations: {'; '.join(weaknesses_b[:4]) if weaknesses_b else 'Not specified'}
+    ASPECTS = [
+        "Task Scalability",
+        "Theoretical Foundation",
+        "Computational Efficiency",
+        "Generalization Capability",
+        "Practical Applicability"
+    ]
+    
+    SYSTEM_PROMPT = """You are writing a comparative analysis table for an academic paper.
 
-=== PROPOSED METHOD ===
-Name: {proposed.method_name}
-Core Idea: {proposed.core_idea}
-Key Components: {', '.join(proposed.components)}
+The user will describe three approaches: Paper A, Paper B and a proposed method. Compare them on each of these aspects. Write DETAILED, READABLE assessments (not single words).
 
 === COMPARISON ASPECTS ===
-{chr(10).join(f"- {a}" for a in aspects)}
+""" + "\n".join(f"- {a}" for a in ASPECTS) + """
 
 IMPORTANT INSTRUCTIONS:
 1. Each assessment should be 8-15 words (complete sentences or phrases)
@@ -570,48 +1045,70 @@ Example good assessments:
 - "Explicitly optimized for memory efficiency through sparse representations"
 
 Return ONLY valid JSON in this exact format:
-{{
-  "Task Scalability": {{
+{
+  "Task Scalability": {
     "paper_a": "detailed assessment here",
     "paper_b": "detailed assessment here",
     "proposed": "detailed assessment showing improvement"
-  }},
-  "Theoretical Foundation": {{
+  },
+  "Theoretical Foundation": {
     "paper_a": "detailed assessment",
     "paper_b": "detailed assessment",
     "proposed": "detailed assessment"
-  }},
-  "Computational Efficiency": {{
+  },
+  "Computational Efficiency": {
     "paper_a": "detailed assessment",
-    "paper_b": "detailed assessment", 
+    "paper_b": "detailed assessment",
     "proposed": "detailed assessment"
-  }},
-  "Generalization Capability": {{
+  },
+  "Generalization Capability": {
     "paper_a": "detailed assessment",
     "paper_b": "detailed assessment",
     "proposed": "detailed assessment"
-  }},
-  "Practical Applicability": {{
+  },
+  "Practical Applicability": {
     "paper_a": "detailed assessment",
     "paper_b": "detailed assessment",
     "proposed": "detailed assessment"
-  }}
-}}"""
+  }
+}"""
+    
+    def generate_comparison(self, 
+                          paper_a: ParsedPaper,
+                          paper_b: ParsedPaper,
+                          weaknesses_a: List[str],
+                          weaknesses_b: List[str],
+                          proposed: ProposedMethod) -> Dict:
+        """Generate comprehensive comparison"""
+        
+        aspects = self.ASPECTS
+        
+        prompt = f"""=== PAPER A ===
+Title: {paper_a.title or 'Untitled Paper A'}
+Key Limitations: {'; '.join(weaknesses_a[:4]) if weaknesses_a else 'Not specified'}
 
-        messages = [{"role": "user", "content": prompt}]
-        response = self.groq.chat_completion(messages, temperature=0.3, max_tokens=2500)
+=== PAPER B ===
+Title: {paper_b.title or 'Untitled Paper B'}
+Key Limitations: {'; '.join(weaknesses_b[:4]) if weaknesses_b else 'Not specified'}
+
+=== PROPOSED METHOD ===
+Name: {proposed.method_name}
+Core Idea: {proposed.core_idea}
+Key Components: {', '.join(proposed.components)}"""
+
+        messages = [
+            {"role": "system", "content": self.SYSTEM_PROMPT},
+            {"role": "user", "content": prompt}
+        ]
+        response = self.groq.chat_completion(
+            messages, temperature=0.3, max_tokens=_budget(len(prompt), 1200, 2500), stop_at_json_end=True
+        )
         
         print(f"[DEBUG] Comparison response preview: {response[:300]}...")
         
         # Parse JSON
         try:
-            response = response.strip()
-            if '```json' in response:
-                response = response.split('```json')[1].split('```')[0]
-            elif '```' in response:
-                response = response.split('```')[1].split('```')[0]
-            
-            comparison = json.loads(response)
+            comparison = _extract_json(response)
             return comparison
         except Exception as e:
             print(f"[ERROR] Failed to parse comparison JSON: {e}")
@@ -629,42 +1126,62 @@ Return ONLY valid JSON in this exact format:
 class ResearchPipeline:
     """Main pipeline orchestrating all steps"""
     
-    def __init__(self, groq_api_key: str):
-        self.groq = GroqClient(groq_api_key)
-        self.parser = PaperParser(self.groq)
+    def __init__(self, groq_api_key: str, pool: Optional[ThreadPoolExecutor] = None):
+        self.pool = pool or get_worker_pool()
+        self.groq = GroqClient(groq_api_key, pool=self.pool)
+        self.parser = PaperParser(self.groq, self.pool)
         self.weakness_extractor = WeaknessExtractor(self.groq)
         self.weakness_normalizer = WeaknessNormalizer(self.groq)
         self.weakness_fusion = WeaknessFusion(self.groq)
         self.method_synthesizer = MethodSynthesizer(self.groq)
         self.comparative_analyzer = ComparativeAnalyzer(self.groq)
     
-    def process(self, pdf_a_path: str, pdf_b_path: str) -> Dict:
-        """Run the complete pipeline"""
-        results = {}
-        
-        # Step 1: Parse papers
-        print("Step 1: Parsing papers...")
-        paper_a = self.parser.parse_pdf(pdf_a_path, "A")
-        paper_b = self.parser.parse_pdf(pdf_b_path, "B")
-        results['paper_a'] = asdict(paper_a)
-        results['paper_b'] = asdict(paper_b)
-        
-        # Step 2: Extract weaknesses
-        print("Step 2: Extracting weaknesses...")
-        weaknesses_a = self.weakness_extractor.extract_from_paper(paper_a)
-        weaknesses_b = self.weakness_extractor.extract_from_paper(paper_b)
+    async def _analyze_paper(self, pdf: PdfSource, paper_id: str):
+        """Run steps 1-3 for a single paper (parse, extract, normalize)"""
+        paper = await self.parser.parse_pdf(pdf, paper_id)
+        weaknesses = await self.weakness_extractor.extract_from_paper(paper)
+        normalized = await self.weakness_normalizer.normalize(weaknesses.weaknesses)
+        return paper, normalized
+    
+    def iter_stages(self, pdf_a: PdfSource, pdf_b: PdfSource):
+        """
+        Run the pipeline, yielding each stage's results as soon as they are ready.
+        Papers may be file paths or raw bytes; A and B are analyzed concurrently
+        and yielded in completion order.
+        """
+        loop = asyncio.new_event_loop()
+        pending = set()
+        try:
+            # Steps 1-3: Parse papers, extract and normalize weaknesses (A and B in parallel)
+            print("Steps 1-3: Parsing papers, extracting and normalizing weaknesses...")
+            pending = {
+                loop.create_task(self._analyze_paper(pdf_a, "A")),
+                loop.create_task(self._analyze_paper(pdf_b, "B"))
+            }
+            analyzed = {}
+            while pending:
+                done, pending = loop.run_until_complete(
+                    asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                )
+                for task in done:
+                    paper, normalized = task.result()
+                    analyzed[paper.paper_id] = (paper, normalized)
+                    suffix = paper.paper_id.lower()
+                    yield {'stage': 'paper', f'paper_{suffix}': paper, f'weaknesses_{suffix}': normalized}
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+            loop.close()
         
-        # Step 3: Normalize weaknesses
-        print("Step 3: Normalizing weaknesses...")
-        normalized_a = self.weakness_normalizer.normalize(weaknesses_a.weaknesses)
-        normalized_b = self.weakness_normalizer.normalize(weaknesses_b.weaknesses)
-        results['weaknesses_a'] = normalized_a
-        results['weaknesses_b'] = normalized_b
+        paper_a, normalized_a = analyzed["A"]
+        paper_b, normalized_b = analyzed["B"]
         
         # Step 4: Weakness fusion
         print("Step 4: Analyzing weakness patterns...")
         analysis = self.weakness_fusion.analyze(normalized_a, normalized_b)
-        results['weakness_analysis'] = asdict(analysis)
+        yield {'stage': 'weakness_analysis', 'weakness_analysis': analysis}
         
         # Step 5: Synthesize new method
         print("Step 5: Synthesizing new method...")
@@ -673,410 +1190,174 @@ class ResearchPipeline:
             paper_a.title or "Paper A",
             paper_b.title or "Paper B"
         )
-        results['proposed_method'] = asdict(proposed)
+        yield {'stage': 'proposed_method', 'proposed_method': proposed}
         
         # Step 6 & 7: Comparative analysis
         print("Step 6: Generating comparative analysis...")
         comparison = self.comparative_analyzer.generate_comparison(
             paper_a, paper_b, normalized_a, normalized_b, proposed
         )
-        results['comparison_table'] = comparison
-        
+        yield {'stage': 'comparison', 'comparison_table': comparison}
+    
+    def process(self, pdf_a: PdfSource, pdf_b: PdfSource) -> Dict:
+        """Run the complete pipeline (paper, analysis and method entries are dataclass instances)"""
+        results = {}
+        for stage in self.iter_stages(pdf_a, pdf_b):
+            stage.pop('stage')
+            results.update(stage)
         return results
 
 # ============================================================================
 # FLASK ROUTES
 # ============================================================================
 
+def pipeline_json_response(results: Dict) -> Response:
+    """Serialize pipeline results, including dataclasses, without building an intermediate dict tree"""
+    if msgspec is not None:
+        return Response(msgspec.json.encode(results), mimetype='application/json')
+    # Flask's JSON provider also handles dataclasses (via asdict)
+    return jsonify(results)
+
+# Demo .txt papers are still accepted; anything else must actually be a PDF
+TEXT_UPLOAD_MIMETYPES = {'text/plain'}
+
+def _validate_upload(file) -> Optional[str]:
+    """Reason to reject an uploaded paper before reading it, or None if it looks acceptable"""
+    head = file.stream.read(4)
+    file.stream.seek(0)
+    if head == b'%PDF' or file.mimetype in TEXT_UPLOAD_MIMETYPES:
+        return None
+    return f"'{file.filename}' is not a PDF or text file"
+
+def _read_uploaded_papers():
+    """
+    Shared request checks for the analysis routes: ((paper_a_bytes, paper_b_bytes), None)
+    when both uploads are acceptable, else (None, (error response, status)).
+    """
+    if not GROQ_API_KEY:
+        return None, (jsonify({'error': 'GROQ_API_KEY not set in environment variables'}), 500)
+    
+    if 'paper_a' not in request.files or 'paper_b' not in request.files:
+        return None, (jsonify({'error': 'Both paper files are required'}), 400)
+    
+    paper_a = request.files['paper_a']
+    paper_b = request.files['paper_b']
+    
+    if paper_a.filename == '' or paper_b.filename == '':
+        return None, (jsonify({'error': 'No files selected'}), 400)
+    
+    error = _validate_upload(paper_a) or _validate_upload(paper_b)
+    if error:
+        return None, (jsonify({'error': error}), 400)
+    
+    return (paper_a.stream.read(), paper_b.stream.read()), None
+
+@app.errorhandler(413)
+def request_too_large(e):
+    limit_mb = app.config['MAX_CONTENT_LENGTH'] // (1024 * 1024)
+    return jsonify({'error': f'Upload too large (limit {limit_mb}MB)'}), 413
+
+def _ndjson_line(obj: Dict) -> bytes:
+    """Encode one newline-delimited JSON record"""
+    if msgspec is not None:
+        return msgspec.json.encode(obj) + b"\n"
+    return (app.json.dumps(obj) + "\n").encode('utf-8')
+
+# Assets linked from the index page; their URLs get a ?v=<content hash> suffix
+INDEX_ASSETS = ('results.css', 'app.js')
+
+def _load_index_page():
+    """Read the static UI once, version its asset links and precompute its gzip body and ETags"""
+    with open(os.path.join(app.static_folder, 'index.html'), 'rb') as f:
+        raw = f.read()
+    for asset in INDEX_ASSETS:
+        with open(os.path.join(app.static_folder, asset), 'rb') as f:
+            version = hashlib.md5(f.read()).hexdigest()[:8]
+        url = f'/static/{asset}'.encode()
+        raw = raw.replace(url + b'"', url + f'?v={version}"'.encode())
+    compressed = gzip.compress(raw, compresslevel=9)
+    digest = hashlib.md5(raw).hexdigest()
+    return raw, compressed, digest, f"{digest}-gzip"
+
+_INDEX_HTML, _INDEX_GZ, _INDEX_ETAG, _INDEX_GZ_ETAG = _load_index_page()
+
 @app.route('/')
 def index():
-    """Render main UI"""
-    html = """
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <title>AI Research Ideation Pipeline</title>
-        <style>
-            * { margin: 0; padding: 0; box-sizing: border-box; }
-            body {
-                font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', sans-serif;
-                background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                min-height: 100vh;
-                padding: 20px;
-            }
-            .container {
-                max-width: 1200px;
-                margin: 0 auto;
-                background: white;
-                border-radius: 20px;
-                padding: 40px;
-                box-shadow: 0 20px 60px rgba(0,0,0,0.3);
-            }
-            h1 {
-                color: #333;
-                margin-bottom: 10px;
-                font-size: 2.5em;
-            }
-            .subtitle {
-                color: #666;
-                margin-bottom: 30px;
-                font-size: 1.1em;
-            }
-            .upload-section {
-                background: #f8f9fa;
-                padding: 30px;
-                border-radius: 12px;
-                margin-bottom: 30px;
-            }
-            .file-input-wrapper {
-                margin-bottom: 20px;
-            }
-            label {
-                display: block;
-                font-weight: 600;
-                margin-bottom: 8px;
-                color: #444;
-            }
-            input[type="file"] {
-                width: 100%;
-                padding: 12px;
-                border: 2px dashed #ddd;
-                border-radius: 8px;
-                background: white;
-                cursor: pointer;
-            }
-            input[type="file"]:hover {
-                border-color: #667eea;
-            }
-            button {
-                background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                color: white;
-                border: none;
-                padding: 15px 40px;
-                font-size: 16px;
-                font-weight: 600;
-                border-radius: 8px;
-                cursor: pointer;
-                transition: transform 0.2s;
-                width: 100%;
-            }
-            button:hover:not(:disabled) {
-                transform: translateY(-2px);
-            }
-            button:disabled {
-                opacity: 0.6;
-                cursor: not-allowed;
-            }
-            #results {
-                margin-top: 30px;
-            }
-            .result-section {
-                background: #f8f9fa;
-                padding: 25px;
-                border-radius: 12px;
-                margin-bottom: 20px;
-                border-left: 4px solid #667eea;
-            }
-            .result-section h3 {
-                color: #333;
-                margin-bottom: 15px;
-                display: flex;
-                align-items: center;
-            }
-            .result-section h3::before {
-                content: '🔍';
-                margin-right: 10px;
-            }
-            .weakness-list {
-                list-style: none;
-                padding-left: 0;
-            }
-            .weakness-list li {
-                padding: 10px;
-                margin-bottom: 8px;
-                background: white;
-                border-radius: 6px;
-                border-left: 3px solid #ff6b6b;
-            }
-            .proposed-method {
-                background: linear-gradient(135deg, #667eea15 0%, #764ba215 100%);
-                padding: 25px;
-                border-radius: 12px;
-                margin: 20px 0;
-            }
-            .proposed-method h2 {
-                color: #667eea;
-                margin-bottom: 15px;
-            }
-            .component-list li {
-                padding: 10px;
-                margin-bottom: 8px;
-                background: white;
-                border-radius: 6px;
-                border-left: 3px solid #51cf66;
-            }
-            table {
-                width: 100%;
-                border-collapse: collapse;
-                margin-top: 20px;
-                background: white;
-                border-radius: 8px;
-                overflow: hidden;
-            }
-            th, td {
-                padding: 15px;
-                text-align: left;
-                border-bottom: 1px solid #e9ecef;
-            }
-            th {
-                background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                color: white;
-                font-weight: 600;
-            }
-            tr:hover {
-                background: #f8f9fa;
-            }
-            .loading {
-                text-align: center;
-                padding: 40px;
-                color: #667eea;
-                font-size: 1.2em;
-            }
-            .spinner {
-                border: 4px solid #f3f3f3;
-                border-top: 4px solid #667eea;
-                border-radius: 50%;
-                width: 40px;
-                height: 40px;
-                animation: spin 1s linear infinite;
-                margin: 20px auto;
-            }
-            @keyframes spin {
-                0% { transform: rotate(0deg); }
-                100% { transform: rotate(360deg); }
-            }
-        </style>
-    </head>
-    <body>
-        <div class="container">
-            <h1>🧠 AI Research Ideation Pipeline</h1>
-            <p class="subtitle">Analyze SOTA papers, extract weaknesses, and synthesize novel research methods</p>
-            
-            <div class="upload-section">
-                <form id="uploadForm" enctype="multipart/form-data">
-                    <div class="file-input-wrapper">
-                        <label for="paper_a">📄 SOTA Paper A (PDF)</label>
-                        <input type="file" id="paper_a" name="paper_a" accept=".pdf,.txt" required>
-                    </div>
-                    
-                    <div class="file-input-wrapper">
-                        <label for="paper_b">📄 SOTA Paper B (PDF)</label>
-                        <input type="file" id="paper_b" name="paper_b" accept=".pdf,.txt" required>
-                    </div>
-                    
-                    <button type="submit" id="submitBtn">🚀 Analyze & Synthesize</button>
-                </form>
-            </div>
-            
-            <div id="results"></div>
-        </div>
-        
-        <script>
-            document.getElementById('uploadForm').addEventListener('submit', async (e) => {
-                e.preventDefault();
-                
-                const formData = new FormData(e.target);
-                const submitBtn = document.getElementById('submitBtn');
-                const resultsDiv = document.getElementById('results');
-                
-                submitBtn.disabled = true;
-                submitBtn.textContent = '⏳ Processing...';
-                resultsDiv.innerHTML = '<div class="loading"><div class="spinner"></div>Running research pipeline... This may take 2-3 minutes.</div>';
-                
-                try {
-                    const response = await fetch('/analyze', {
-                        method: 'POST',
-                        body: formData
-                    });
-                    
-                    const data = await response.json();
-                    
-                    if (data.error) {
-                        resultsDiv.innerHTML = `<div class="result-section" style="border-left-color: #ff6b6b;"><h3>❌ Error</h3><p>${data.error}</p></div>`;
-                    } else {
-                        displayResults(data);
-                    }
-                } catch (error) {
-                    resultsDiv.innerHTML = `<div class="result-section" style="border-left-color: #ff6b6b;"><h3>❌ Error</h3><p>${error.message}</p></div>`;
-                } finally {
-                    submitBtn.disabled = false;
-                    submitBtn.textContent = '🚀 Analyze & Synthesize';
-                }
-            });
-            
-            function displayResults(data) {
-                const resultsDiv = document.getElementById('results');
-                
-                let html = '<h2 style="margin-bottom: 20px;">📊 Analysis Results</h2>';
-                
-                // Paper summaries
-                html += `
-                    <div class="result-section">
-                        <h3>📄 Paper A: ${data.paper_a.title || 'Unknown'}</h3>
-                    </div>
-                    
-                    <div class="result-section">
-                        <h3>📄 Paper B: ${data.paper_b.title || 'Unknown'}</h3>
-                    </div>
-                `;
-                
-                // Weaknesses
-                html += `
-                    <div class="result-section">
-                        <h3>⚠️ Weaknesses of Paper A</h3>
-                        <ul class="weakness-list">
-                            ${data.weaknesses_a.map(w => `<li>${w}</li>`).join('')}
-                        </ul>
-                    </div>
-                    
-                    <div class="result-section">
-                        <h3>⚠️ Weaknesses of Paper B</h3>
-                        <ul class="weakness-list">
-                            ${data.weaknesses_b.map(w => `<li>${w}</li>`).join('')}
-                        </ul>
-                    </div>
-                `;
-                
-                // Weakness Analysis
-                const analysis = data.weakness_analysis;
-                html += `
-                    <div class="result-section">
-                        <h3>🔄 Weakness Pattern Analysis</h3>
-                        <p><strong>Shared weaknesses:</strong></p>
-                        <ul class="weakness-list">
-                            ${analysis.shared.map(w => `<li>${w}</li>`).join('') || '<li>None identified</li>'}
-                        </ul>
-                        <p style="margin-top: 15px;"><strong>Unique to Paper A:</strong></p>
-                        <ul class="weakness-list">
-                            ${analysis.paper_a_only.map(w => `<li>${w}</li>`).join('') || '<li>None identified</li>'}
-                        </ul>
-                        <p style="margin-top: 15px;"><strong>Unique to Paper B:</strong></p>
-                        <ul class="weakness-list">
-                            ${analysis.paper_b_only.map(w => `<li>${w}</li>`).join('') || '<li>None identified</li>'}
-                        </ul>
-                    </div>
-                `;
-                
-                // Proposed Method
-                const method = data.proposed_method;
-                html += `
-                    <div class="proposed-method">
-                        <h2>💡 ${method.method_name}</h2>
-                        <p style="margin: 15px 0; line-height: 1.6;"><strong>Core Idea:</strong> ${method.core_idea}</p>
-                        <p><strong>Key Components:</strong></p>
-                        <ul class="component-list">
-                            ${method.components.map(c => `<li>${c}</li>`).join('')}
-                        </ul>
-                        <p style="margin-top: 15px; line-height: 1.6;"><strong>Addresses Weaknesses:</strong> ${method.addresses_weaknesses}</p>
-                    </div>
-                `;
-                
-                // Comparison Table
-                html += `
-                    <div class="result-section">
-                        <h3>📊 Comparative Analysis</h3>
-                        <table>
-                            <thead>
-                                <tr>
-                                    <th>Aspect</th>
-                                    <th>Paper A</th>
-                                    <th>Paper B</th>
-                                    <th>Proposed Method</th>
-                                </tr>
-                            </thead>
-                            <tbody>
-                `;
-                
-                for (const [aspect, values] of Object.entries(data.comparison_table)) {
-                    html += `
-                        <tr>
-                            <td><strong>${aspect}</strong></td>
-                            <td>${values.paper_a || 'N/A'}</td>
-                            <td>${values.paper_b || 'N/A'}</td>
-                            <td>${values.proposed || 'N/A'}</td>
-                        </tr>
-                    `;
-                }
-                
-                html += `
-                            </tbody>
-                        </table>
-                    </div>
-                `;
-                
-                resultsDiv.innerHTML = html;
-            }
-        </script>
-    </body>
-    </html>
-    """
-    return render_template_string(html)
+    """Render main UI (pre-compressed once at import; no per-request work)"""
+    use_gzip = 'gzip' in request.headers.get('Accept-Encoding', '')
+    etag = _INDEX_GZ_ETAG if use_gzip else _INDEX_ETAG
+    headers = {'ETag': f'"{etag}"', 'Cache-Control': 'public, max-age=3600', 'Vary': 'Accept-Encoding'}
+    
+    if request.if_none_match.contains(etag):
+        return Response(status=304, headers=headers)
+    if use_gzip:
+        return Response(_INDEX_GZ, mimetype='text/html', headers={**headers, 'Content-Encoding': 'gzip'})
+    return Response(_INDEX_HTML, mimetype='text/html', headers=headers)
 
 @app.route('/analyze', methods=['POST'])
 def analyze():
     """Main analysis endpoint"""
     try:
-        # Check for API key
-        if not GROQ_API_KEY:
-            return jsonify({'error': 'GROQ_API_KEY not set in environment variables'}), 500
-        
-        # Get uploaded files
-        if 'paper_a' not in request.files or 'paper_b' not in request.files:
-            return jsonify({'error': 'Both paper files are required'}), 400
-        
-        paper_a = request.files['paper_a']
-        paper_b = request.files['paper_b']
-        
-        if paper_a.filename == '' or paper_b.filename == '':
-            return jsonify({'error': 'No files selected'}), 400
-        
-        # Save files temporarily
-        temp_dir = tempfile.mkdtemp()
-        paper_a_path = os.path.join(temp_dir, secure_filename(paper_a.filename))
-        paper_b_path = os.path.join(temp_dir, secure_filename(paper_b.filename))
-        
-        paper_a.save(paper_a_path)
-        paper_b.save(paper_b_path)
+        papers, error = _read_uploaded_papers()
+        if error:
+            return error
+        paper_a_bytes, paper_b_bytes = papers
         
         # Run pipeline
         pipeline = ResearchPipeline(GROQ_API_KEY)
-        results = pipeline.process(paper_a_path, paper_b_path)
-        
-        # Cleanup
-        os.remove(paper_a_path)
-        os.remove(paper_b_path)
-        os.rmdir(temp_dir)
-        
-        return jsonify(results)
+        results = pipeline.process(paper_a_bytes, paper_b_bytes)
         
+        return pipeline_json_response(results)
+    
+    except HTTPException:
+        raise  # e.g. 413 from MAX_CONTENT_LENGTH, handled by its error handler
     except Exception as e:
-        import traceback
-        print(traceback.format_exc())
+        app.logger.exception("analyze failed")
         return jsonify({'error': str(e)}), 500
 
+@app.route('/analyze/stream', methods=['POST'])
+def analyze_stream():
+    """
+    Streaming variant of /analyze.
+    Returns NDJSON: one {"stage": ..., ...} record per pipeline stage as it completes.
+    """
+    # Read uploads now; the request stream is gone once the response starts
+    papers, error = _read_uploaded_papers()
+    if error:
+        return error
+    paper_a_bytes, paper_b_bytes = papers
+    
+    def generate():
+        try:
+            pipeline = ResearchPipeline(GROQ_API_KEY)
+            for stage in pipeline.iter_stages(paper_a_bytes, paper_b_bytes):
+                yield _ndjson_line(stage)
+            yield _ndjson_line({'stage': 'done'})
+        except Exception as e:
+            app.logger.exception("analyze/stream failed")
+            yield _ndjson_line({'stage': 'error', 'error': str(e)})
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+# Health fields are fixed once the process has started, so encode them once
+_HEALTH_BODY = app.json.dumps({
+    'status': 'healthy',
+    'groq_api_configured': bool(GROQ_API_KEY),
+    'groq_api_key_length': len(GROQ_API_KEY) if GROQ_API_KEY else 0,
+    'model': MODEL_NAME
+})
+
 @app.route('/health', methods=['GET'])
 def health():
     """Health check endpoint"""
-    return jsonify({
-        'status': 'healthy',
-        'groq_api_configured': bool(GROQ_API_KEY),
-        'groq_api_key_length': len(GROQ_API_KEY) if GROQ_API_KEY else 0,
-        'model': MODEL_NAME
-    })
+    return Response(_HEALTH_BODY, mimetype='application/json')
 
 @app.route('/debug', methods=['GET'])
 def debug_info():
-    """Debug endpoint to test configuration"""
+    """Debug endpoint to test configuration (makes a live Groq call, so dev server only)"""
+    if not app.debug:
+        abort(404)
+    
     result = {
         'api_key_set': bool(GROQ_API_KEY),
         'api_key_preview': f"{GROQ_API_KEY[:10]}..." if GROQ_API_KEY else "NOT SET",
@@ -1092,7 +1373,8 @@ def debug_info():
             response = groq.chat_completion(
                 [{"role": "user", "content": "Say 'API working' and nothing else"}],
                 temperature=0.1,
-                max_tokens=20
+                max_tokens=20,
+                use_cache=False
             )
             result['test_connection'] = True
             result['test_response'] = response
@@ -1163,9 +1445,7 @@ def identify_sota():
         return jsonify(results)
         
     except Exception as e:
-        import traceback
-        print(f"[SOTA API] Error: {e}")
-        print(traceback.format_exc())
+        app.logger.exception("[SOTA API] Error")
         return jsonify({'error': str(e)}), 500
 
 @app.route('/sota/quick', methods=['GET'])
@@ -1197,6 +1477,7 @@ def quick_sota():
         return jsonify(results)
         
     except Exception as e:
+        app.logger.exception("[SOTA API] Quick search error")
         return jsonify({'error': str(e)}), 500
 
 # ============================================================================
@@ -2,15 +2,99 @@
 # API WRAPPERS FOR ARXIV AND SEMANTIC SCHOLAR
 # =====================================================================
 
+import json
+import re
 import requests
-import xml.etree.ElementTree as ET
-from typing import List, Dict, Optional
+import urllib3
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Optional, Tuple
 from datetime import datetime
+import threading
 import time
 import logging
+from services.cache import get_cache
+
+# libxml2-backed lxml parses several times faster; defusedxml (entity-expansion
+# guards over the stdlib parser) and then the plain stdlib parser are the fallbacks
+try:
+    from lxml import etree as ET
+    # Never expand entities or fetch DTDs from untrusted API responses
+    ITERPARSE_OPTIONS = {'tag': '{http://www.w3.org/2005/Atom}entry', 'resolve_entities': False, 'no_network': True}
+    XML_ERRORS = (ET.ParseError,)
+except ImportError:
+    try:
+        from defusedxml import ElementTree as ET
+        from defusedxml import DefusedXmlException
+        # Refused entities/DTDs raise DefusedXmlException (a ValueError), not ParseError
+        XML_ERRORS = (ET.ParseError, DefusedXmlException)
+    except ImportError:
+        import xml.etree.ElementTree as ET
+        XML_ERRORS = (ET.ParseError,)
+    ITERPARSE_OPTIONS = {}
 
 logger = logging.getLogger(__name__)
 
+# Fully-qualified Atom tags, so lookups skip per-call namespace prefix resolution
+ATOM_NS = '{http://www.w3.org/2005/Atom}'
+ATOM_ENTRY = ATOM_NS + 'entry'
+ATOM_ID = ATOM_NS + 'id'
+ATOM_TITLE = ATOM_NS + 'title'
+ATOM_SUMMARY = ATOM_NS + 'summary'
+ATOM_AUTHOR = ATOM_NS + 'author'
+ATOM_NAME = ATOM_NS + 'name'
+ATOM_PUBLISHED = ATOM_NS + 'published'
+ATOM_UPDATED = ATOM_NS + 'updated'
+ATOM_CATEGORY = ATOM_NS + 'category'
+ATOM_LINK = ATOM_NS + 'link'
+
+# Words that add nothing to an ArXiv search (and AND/OR/NOT would be read as operators)
+QUERY_STOPWORDS = frozenset({
+    'a', 'an', 'and', 'are', 'as', 'at', 'by', 'for', 'from', 'in', 'into', 'is',
+    'not', 'of', 'on', 'or', 'the', 'to', 'using', 'via', 'with'
+})
+_QUERY_TOKEN_RE = re.compile(r"\w[\w-]*")
+
+# Flattens line breaks/tabs in titles and abstracts in a single pass
+_WHITESPACE_TABLE = str.maketrans({'\n': ' ', '\r': ' ', '\t': ' '})
+
+
+USER_AGENT = 'ResearchIdeationPipeline/1.0'
+
+
+def _create_session(pool_size: int = 16) -> requests.Session:
+    """Pooled session shared by all wrapper instances so TCP/TLS connections outlive a single /sota call"""
+    session = requests.Session()
+    session.headers.update({'User-Agent': USER_AGENT})
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+_ARXIV_SESSION = _create_session()
+_S2_SESSION = _create_session()
+
+
+class RateLimiter:
+    """
+    Thread-safe limiter that spaces calls at least 1/rate seconds apart.
+    Callers reserve the next free slot under the lock, then sleep outside it.
+    """
+    
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+    
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
 class ArxivWrapper:
     """
     Wrapper for ArXiv API to search and fetch papers.
@@ -19,11 +103,9 @@ class ArxivWrapper:
     
     BASE_URL = "http://export.arxiv.org/api/query"
     
-    def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'ResearchIdeationPipeline/1.0'
-        })
+    def __init__(self, session: Optional[requests.Session] = None):
+        self.session = session or _ARXIV_SESSION
+        self.cache = get_cache('arxiv')
     
     def search(
         self,
@@ -49,6 +131,12 @@ class ArxivWrapper:
             List of paper dictionaries
         """
         
+        cache_key = json.dumps([query, start_date, end_date, max_results, sort_by, sort_order])
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            logger.info(f"[ArXiv] Cache hit for: {query} ({len(cached)} papers)")
+            return cached
+        
         # Build search query
         search_query = self._build_query(query)
         
@@ -62,54 +150,70 @@ class ArxivWrapper:
         
         try:
             logger.info(f"[ArXiv] Searching for: {query}")
-            response = self.session.get(self.BASE_URL, params=params, timeout=30)
-            response.raise_for_status()
-            
-            papers = self._parse_response(response.text)
+            with self.session.get(self.BASE_URL, params=params, timeout=30, stream=True) as response:
+                response.raise_for_status()
+                response.raw.decode_content = True  # Undo any gzip transfer encoding
+                papers, complete = self._parse_response(response.raw, max_entries=max_results)
             
             # Filter by date if specified
             if start_date or end_date:
                 papers = self._filter_by_date(papers, start_date, end_date)
             
             logger.info(f"[ArXiv] Found {len(papers)} papers")
+            if complete:
+                self.cache.set(cache_key, papers)
             return papers
             
-        except requests.RequestException as e:
+        except (requests.RequestException, urllib3.exceptions.HTTPError) as e:
+            # Body is read lazily during parsing, so mid-stream failures surface from urllib3
             logger.error(f"[ArXiv] API error: {e}")
             return []
     
     def _build_query(self, query: str) -> str:
         """Build ArXiv search query string."""
-        # Search in title, abstract, and categories
-        # Clean and format query
-        clean_query = query.replace('"', '').strip()
+        # Every meaningful word must appear somewhere in the paper's fields; one
+        # all: clause per word (all: already covers title and abstract)
+        tokens = [
+            tok for tok in _QUERY_TOKEN_RE.findall(query.lower())
+            if tok not in QUERY_STOPWORDS
+        ]
+        if not tokens:
+            clean_query = query.replace('"', '').strip()
+            return f'all:"{clean_query}"'
         
-        # Search in all fields with OR between title and abstract
-        return f'all:"{clean_query}" OR ti:"{clean_query}" OR abs:"{clean_query}"'
+        return '(' + ' AND '.join(f'all:{tok}' for tok in tokens) + ')'
     
-    def _parse_response(self, xml_text: str) -> List[Dict]:
-        """Parse ArXiv API XML response."""
+    def _parse_response(self, xml_stream, max_entries: Optional[int] = None) -> Tuple[List[Dict], bool]:
+        """
+        Parse ArXiv API XML from a binary file-like stream, one entry at a time as it arrives.
+        Stops reading once max_entries papers are collected, so an oversized response can't exhaust memory.
+        Returns the papers and whether parsing finished cleanly; a malformed response yields only
+        the entries before the error, which must not be cached as the full result.
+        """
         papers = []
         
         try:
-            root = ET.fromstring(xml_text)
-            ns = {'atom': 'http://www.w3.org/2005/Atom'}
-            
-            for entry in root.findall('atom:entry', ns):
-                paper = self._parse_entry(entry, ns)
+            for _, elem in ET.iterparse(xml_stream, events=('end',), **ITERPARSE_OPTIONS):
+                if elem.tag != ATOM_ENTRY:
+                    continue
+                paper = self._parse_entry(elem)
                 if paper:
                     papers.append(paper)
+                elem.clear()  # Entry is fully consumed; free its subtree
+                if max_entries is not None and len(papers) >= max_entries:
+                    break
                     
-        except ET.ParseError as e:
+        except XML_ERRORS as e:
             logger.error(f"[ArXiv] XML parse error: {e}")
+            return papers, False
             
-        return papers
+        return papers, True
     
-    def _parse_entry(self, entry, ns: dict) -> Optional[Dict]:
+    def _parse_entry(self, entry) -> Optional[Dict]:
         """Parse a single ArXiv entry."""
         try:
             # Extract paper ID
-            id_elem = entry.find('atom:id', ns)
+            id_elem = entry.find(ATOM_ID)
             if id_elem is None:
                 return None
                 
@@ -117,38 +221,38 @@ class ArxivWrapper:
             paper_id = arxiv_url.split('/')[-1]
             
             # Extract title
-            title_elem = entry.find('atom:title', ns)
-            title = title_elem.text.strip().replace('\n', ' ') if title_elem is not None else "Unknown"
+            title_elem = entry.find(ATOM_TITLE)
+            title = title_elem.text.translate(_WHITESPACE_TABLE).strip() if title_elem is not None else "Unknown"
             
             # Extract abstract
-            summary_elem = entry.find('atom:summary', ns)
-            abstract = summary_elem.text.strip().replace('\n', ' ') if summary_elem is not None else ""
+            summary_elem = entry.find(ATOM_SUMMARY)
+            abstract = summary_elem.text.translate(_WHITESPACE_TABLE).strip() if summary_elem is not None else ""
             
             # Extract authors
             authors = []
-            for author in entry.findall('atom:author', ns):
-                name_elem = author.find('atom:name', ns)
+            for author in entry.findall(ATOM_AUTHOR):
+                name_elem = author.find(ATOM_NAME)
                 if name_elem is not None:
                     authors.append(name_elem.text)
             
             # Extract published date
-            published_elem = entry.find('atom:published', ns)
+            published_elem = entry.find(ATOM_PUBLISHED)
             published = published_elem.text[:10] if published_elem is not None else None
             
             # Extract updated date
-            updated_elem = entry.find('atom:updated', ns)
+            updated_elem = entry.find(ATOM_UPDATED)
             updated = updated_elem.text[:10] if updated_elem is not None else None
             
             # Extract categories
             categories = []
-            for category in entry.findall('atom:category', ns):
+            for category in entry.findall(ATOM_CATEGORY):
                 term = category.get('term')
                 if term:
                     categories.append(term)
             
             # Get PDF link
             pdf_url = None
-            for link in entry.findall('atom:link', ns):
+            for link in entry.findall(ATOM_LINK):
                 if link.get('title') == 'pdf':
                     pdf_url = link.get('href')
                     break
@@ -176,6 +280,9 @@ class ArxivWrapper:
     
     def _filter_by_date(self, papers: List[Dict], start_date: str, end_date: str) -> List[Dict]:
         """Filter papers by date range."""
+        # Parse the bounds once rather than per paper; an unparseable bound is ignored
+        start = self._parse_date(start_date)
+        end = self._parse_date(end_date)
         filtered = []
         
         for paper in papers:
@@ -184,24 +291,29 @@ class ArxivWrapper:
                 continue
                 
             try:
-                pub = datetime.strptime(pub_date, '%Y-%m-%d')
-                
-                if start_date:
-                    start = datetime.strptime(start_date, '%Y-%m-%d')
-                    if pub < start:
-                        continue
-                        
-                if end_date:
-                    end = datetime.strptime(end_date, '%Y-%m-%d')
-                    if pub > end:
-                        continue
-                        
-                filtered.append(paper)
-                
+                pub = datetime.fromisoformat(pub_date)
             except ValueError:
                 filtered.append(paper)  # Include if date parsing fails
+                continue
+            
+            if start and pub < start:
+                continue
+            if end and pub > end:
+                continue
+            filtered.append(paper)
                 
         return filtered
+    
+    @staticmethod
+    def _parse_date(date_str: Optional[str]) -> Optional[datetime]:
+        """YYYY-MM-DD string to datetime, or None if missing or malformed."""
+        if not date_str:
+            return None
+        try:
+            return datetime.fromisoformat(date_str)
+        except ValueError:
+            logger.warning(f"[ArXiv] Ignoring invalid date filter: {date_str}")
+            return None
 
 
 class SemanticScholarWrapper:
@@ -212,65 +324,136 @@ class SemanticScholarWrapper:
     
     BASE_URL = "https://api.semanticscholar.org/graph/v1"
     
-    def __init__(self, api_key: Optional[str] = None):
-        self.session = requests.Session()
+    # Requests per second: keyed clients get a higher quota
+    KEYED_RATE = 10
+    ANONYMOUS_RATE = 2  # Same pace as the old fixed 0.5s sleep
+    MAX_WORKERS = 8  # Only used when the batch endpoint is unavailable
+    BATCH_SIZE = 500  # Maximum IDs accepted by /paper/batch
+    PAPER_FIELDS = 'title,abstract,year,citationCount,influentialCitationCount,referenceCount,fieldsOfStudy,publicationTypes,authors'
+    
+    def __init__(self, api_key: Optional[str] = None, requests_per_second: Optional[float] = None,
+                 session: Optional[requests.Session] = None):
+        self.rate_limiter = RateLimiter(requests_per_second or (self.KEYED_RATE if api_key else self.ANONYMOUS_RATE))
+        self.session = session or _S2_SESSION
+        # Sent per request: the pooled session is shared with instances using other keys
         self.headers = {
-            'User-Agent': 'ResearchIdeationPipeline/1.0'
+            'User-Agent': USER_AGENT
         }
         if api_key:
             self.headers['x-api-key'] = api_key
-        self.session.headers.update(self.headers)
+        self.cache = get_cache('semantic_scholar')
     
     def get_paper_by_arxiv_id(self, arxiv_id: str) -> Optional[Dict]:
         """
         Get paper details and metrics from Semantic Scholar using ArXiv ID.
         """
         # Clean ArXiv ID
-        clean_id = arxiv_id.replace('arXiv:', '').strip()
+        clean_id = self._clean_id(arxiv_id)
+        
+        # Hits skip the rate limiter entirely; {} marks a known 404
+        cached = self.cache.get(clean_id)
+        if cached is not None:
+            return cached or None
         
         url = f"{self.BASE_URL}/paper/arXiv:{clean_id}"
         params = {
-            'fields': 'title,abstract,year,citationCount,influentialCitationCount,referenceCount,fieldsOfStudy,publicationTypes,authors'
+            'fields': self.PAPER_FIELDS
         }
         
         try:
-            # Rate limiting - be nice to the API
-            time.sleep(0.5)
+            # Rate limiting - be nice to the API (shared across worker threads)
+            self.rate_limiter.wait()
             
-            response = self.session.get(url, params=params, timeout=10)
+            response = self.session.get(url, params=params, headers=self.headers, timeout=10)
             
             if response.status_code == 404:
                 logger.debug(f"[SemanticScholar] Paper not found: {arxiv_id}")
+                self.cache.set(clean_id, {})
                 return None
                 
             response.raise_for_status()
-            data = response.json()
-            
-            return {
-                'semantic_scholar_id': data.get('paperId'),
-                'citation_count': data.get('citationCount', 0),
-                'influential_citation_count': data.get('influentialCitationCount', 0),
-                'reference_count': data.get('referenceCount', 0),
-                'fields_of_study': data.get('fieldsOfStudy', []),
-                'year': data.get('year')
-            }
+            metrics = self._extract_metrics(response.json())
+            self.cache.set(clean_id, metrics)
+            return metrics
             
         except requests.RequestException as e:
             logger.debug(f"[SemanticScholar] API error for {arxiv_id}: {e}")
             return None
     
-    def enrich_papers(self, papers: List[Dict]) -> List[Dict]:
+    def get_papers_by_arxiv_ids(self, clean_ids: List[str]) -> Dict[str, Optional[Dict]]:
+        """
+        Look up many papers through the batch endpoint, BATCH_SIZE IDs per request.
+        Raises requests.RequestException so callers can fall back to single lookups.
+        """
+        results = {}
+        for start in range(0, len(clean_ids), self.BATCH_SIZE):
+            chunk = clean_ids[start:start + self.BATCH_SIZE]
+            self.rate_limiter.wait()
+            
+            response = self.session.post(
+                f"{self.BASE_URL}/paper/batch",
+                params={'fields': self.PAPER_FIELDS},
+                json={'ids': [f"ARXIV:{clean_id}" for clean_id in chunk]},
+                headers=self.headers,
+                timeout=30
+            )
+            response.raise_for_status()
+            
+            # Entries come back in request order, with null for unknown IDs
+            for clean_id, data in zip(chunk, response.json()):
+                metrics = self._extract_metrics(data) if data else {}
+                self.cache.set(clean_id, metrics)
+                results[clean_id] = metrics or None
+        
+        return results
+    
+    def enrich_papers(self, papers: List[Dict], single_fallback: bool = True) -> List[Dict]:
         """
         Enrich a list of papers with Semantic Scholar metrics.
+        Uncached IDs are fetched with batch requests; if the batch endpoint fails,
+        lookups fall back to concurrent single-paper requests (rate limited, so
+        slow for long lists) unless single_fallback is False.
         """
-        enriched = []
+        clean_ids = [self._clean_id(paper['arxiv_id']) if paper.get('arxiv_id') else None for paper in papers]
         
-        for paper in papers:
-            arxiv_id = paper.get('arxiv_id')
-            if arxiv_id:
-                metrics = self.get_paper_by_arxiv_id(arxiv_id)
-                if metrics:
-                    paper.update(metrics)
-            enriched.append(paper)
-            
-        return enriched
+        all_metrics = {}
+        missing = []
+        for clean_id in dict.fromkeys(filter(None, clean_ids)):
+            cached = self.cache.get(clean_id)
+            if cached is not None:
+                all_metrics[clean_id] = cached or None
+            else:
+                missing.append(clean_id)
+        
+        if missing:
+            try:
+                all_metrics.update(self.get_papers_by_arxiv_ids(missing))
+            except (requests.RequestException, ValueError) as e:
+                if single_fallback:
+                    logger.debug(f"[SemanticScholar] Batch lookup failed, falling back to single requests: {e}")
+                    with ThreadPoolExecutor(max_workers=self.MAX_WORKERS) as executor:
+                        all_metrics.update(zip(missing, executor.map(self.get_paper_by_arxiv_id, missing)))
+                else:
+                    logger.debug(f"[SemanticScholar] Batch lookup failed: {e}")
+        
+        for paper, clean_id in zip(papers, clean_ids):
+            metrics = all_metrics.get(clean_id) if clean_id else None
+            if metrics:
+                paper.update(metrics)
+        
+        return papers
+    
+    @staticmethod
+    def _clean_id(arxiv_id: str) -> str:
+        return arxiv_id.replace('arXiv:', '').strip()
+    
+    @staticmethod
+    def _extract_metrics(data: Dict) -> Dict:
+        return {
+            'semantic_scholar_id': data.get('paperId'),
+            'citation_count': data.get('citationCount', 0),
+            'influential_citation_count': data.get('influentialCitationCount', 0),
+            'reference_count': data.get('referenceCount', 0),
+            'fields_of_study': data.get('fieldsOfStudy', []),
+            'year': data.get('year')
+        }
@@ -0,0 +1,116 @@
+# =====================================================================
+# RESPONSE CACHE FOR EXTERNAL APIS
+# =====================================================================
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR = os.environ.get('SOTA_CACHE_DIR', os.path.expanduser('~/.cache/sota'))
+DEFAULT_TTL = 24 * 60 * 60  # Citation counts and search results drift over days, not hours
+DEFAULT_MAX_MEMORY_ENTRIES = 4096
+PURGE_EVERY = 256  # Writes between sweeps of expired rows
+
+
+class TTLCache:
+    """
+    Two-level cache for JSON-serializable API payloads: an in-memory LRU in
+    front of an SQLite file, both expiring entries after `ttl` seconds.
+    Values are stored serialized, so callers always get a fresh copy they
+    are free to mutate. Falls back to memory only if the disk is unusable.
+    """
+
+    def __init__(self, namespace: str, cache_dir: str = CACHE_DIR, ttl: int = DEFAULT_TTL,
+                 max_memory_entries: int = DEFAULT_MAX_MEMORY_ENTRIES):
+        self.ttl = ttl
+        self.max_memory_entries = max_memory_entries
+        self._lock = threading.Lock()
+        self._memory = OrderedDict()  # key -> (expires_at, serialized value)
+        self._conn = None
+        self._sets_since_purge = 0
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            self._conn = sqlite3.connect(os.path.join(cache_dir, f'{namespace}.sqlite3'), check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, value TEXT, expires_at REAL)"
+            )
+            self._purge_expired()
+            self._conn.commit()
+        except (OSError, sqlite3.Error) as e:
+            logger.warning(f"[Cache] Disk cache for '{namespace}' disabled: {e}")
+            self._conn = None
+
+    def get(self, key: str) -> Optional[Any]:
+        """Cached value for key, or None if missing or expired"""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if entry[0] >= now:
+                    self._memory.move_to_end(key)
+                    return json.loads(entry[1])
+                del self._memory[key]
+
+            if self._conn is None:
+                return None
+            try:
+                row = self._conn.execute(
+                    "SELECT value, expires_at FROM entries WHERE key = ?", (key,)
+                ).fetchone()
+            except sqlite3.Error as e:
+                # e.g. "database is locked" by another worker: a miss, not a failed request
+                logger.warning(f"[Cache] Read failed: {e}")
+                return None
+            if row is None or row[1] < now:
+                return None
+            self._remember(key, row[0], row[1])
+        return json.loads(row[0])
+
+    def set(self, key: str, value: Any):
+        serialized = json.dumps(value)
+        expires_at = time.time() + self.ttl
+        with self._lock:
+            self._remember(key, serialized, expires_at)
+            if self._conn is not None:
+                try:
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO entries (key, value, expires_at) VALUES (?, ?, ?)",
+                        (key, serialized, expires_at)
+                    )
+                    self._sets_since_purge += 1
+                    if self._sets_since_purge >= PURGE_EVERY:
+                        self._purge_expired()
+                    self._conn.commit()
+                except sqlite3.Error as e:
+                    # Locked or full disk: the value is still in the memory LRU
+                    logger.warning(f"[Cache] Write failed: {e}")
+                    self._conn.rollback()
+
+    def _purge_expired(self):
+        """Drop stale rows: get() never serves them, but nothing else would ever delete them"""
+        self._conn.execute("DELETE FROM entries WHERE expires_at < ?", (time.time(),))
+        self._sets_since_purge = 0
+
+    def _remember(self, key: str, serialized: str, expires_at: float):
+        self._memory[key] = (expires_at, serialized)
+        self._memory.move_to_end(key)
+        if len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+
+_caches: Dict[str, TTLCache] = {}
+_caches_lock = threading.Lock()
+
+def get_cache(namespace: str, ttl: int = DEFAULT_TTL, cache_dir: str = CACHE_DIR) -> TTLCache:
+    """Process-wide cache for a namespace, shared by every wrapper instance"""
+    with _caches_lock:
+        if namespace not in _caches:
+            _caches[namespace] = TTLCache(namespace, cache_dir=cache_dir, ttl=ttl)
+        return _caches[namespace]
@@ -0,0 +1,32 @@
+# =====================================================================
+# LOCAL SENTENCE EMBEDDINGS
+# =====================================================================
+
+import logging
+import os
+import threading
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_MODEL_NAME = "all-MiniLM-L6-v2"
+EMBEDDING_BACKEND = os.environ.get('EMBEDDING_BACKEND', 'torch')  # "onnx" needs sentence-transformers>=3.2 + optimum
+
+_embedder = None
+_embedder_lock = threading.Lock()
+
+def get_embedder():
+    """
+    Process-wide sentence embedding model shared by the comparison pipeline and
+    SOTA ranking, or None if sentence-transformers is not installed
+    """
+    global _embedder
+    with _embedder_lock:
+        if _embedder is None:
+            try:
+                from sentence_transformers import SentenceTransformer
+                options = {} if EMBEDDING_BACKEND == 'torch' else {'backend': EMBEDDING_BACKEND}
+                _embedder = SentenceTransformer(EMBEDDING_MODEL_NAME, device="cpu", **options)
+            except Exception as e:
+                logger.warning(f"[Embeddings] Local embeddings unavailable: {e}")
+                _embedder = False
+    return _embedder or None
@@ -0,0 +1,64 @@
+# =====================================================================
+# STREAMED JSON HELPERS
+# =====================================================================
+
+import json
+
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+
+class JsonEndDetector:
+    """Tracks brace depth over streamed text to spot the end of the top-level JSON object"""
+    
+    def __init__(self):
+        self.depth = 0
+        self.started = False
+        self.in_string = False
+        self.escaped = False
+    
+    def feed(self, chunk: str) -> bool:
+        """Consume a chunk; True once the outermost object has been closed"""
+        for ch in chunk:
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif ch == '\\':
+                    self.escaped = True
+                elif ch == '"':
+                    self.in_string = False
+            elif ch == '"':
+                self.in_string = self.started
+            elif ch == '{':
+                self.depth += 1
+                self.started = True
+            elif ch == '}' and self.started:
+                self.depth -= 1
+                if self.depth == 0:
+                    return True
+        return False
+
+
+def read_streamed_json(response) -> str:
+    """
+    Collect the content deltas of a streamed (SSE) chat completion, stopping
+    as soon as the top-level JSON object closes. SSE is always UTF-8, so lines
+    are read as bytes: requests would decode a charset-less text/event-stream
+    as ISO-8859-1.
+    """
+    detector = JsonEndDetector()
+    parts = []
+    for line in response.iter_lines():
+        if not line.startswith(b'data: '):
+            continue
+        data = line[len(b'data: '):]
+        if data == b'[DONE]':
+            break
+        delta = _json_loads(data)['choices'][0]['delta'].get('content') or ''
+        parts.append(delta)
+        if detector.feed(delta):
+            break
+    return ''.join(parts)
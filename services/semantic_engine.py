@@ -2,30 +2,182 @@
 # SEMANTIC RANKING ENGINE
 # =====================================================================
 
+import base64
+import hashlib
+import json
 import logging
+import math
 import os
-from typing import List, Dict
+import re
+import threading
+import time
+from collections import Counter
+from typing import List, Dict, Optional
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from services.cache import get_cache
+from services.embeddings import EMBEDDING_MODEL_NAME, get_embedder
+from services.json_stream import read_streamed_json
+
+try:
+    import orjson
+    _json_loads = orjson.loads
+    _json_dumps = orjson.dumps
+except ImportError:
+    _json_loads = json.loads
+    _json_dumps = lambda obj: json.dumps(obj).encode('utf-8')
+
+try:
+    import numpy as np
+except ImportError:
+    np = None  # Only needed alongside sentence-transformers, which depends on it
 
 logger = logging.getLogger(__name__)
 
+# Outermost JSON object in a reply, ignoring code fences or prose the model wraps around it
+_JSON_OBJECT_RE = re.compile(r'\{.*\}', re.S)
+
+LLM_CACHE_TTL = 7 * 24 * 60 * 60  # Answers only change with the prompt or model, which are both in the key
+
+GROQ_POOL_SIZE = 20  # Concurrent Groq calls that each keep their own warm connection
+
+
+def _create_groq_session(pool_size: int = GROQ_POOL_SIZE) -> requests.Session:
+    """
+    Keep-alive pool shared by every engine instance (one is built per /sota request).
+    Connection errors and 5xx responses are retried here; 429s are left to
+    SemanticEngine._chat so the retry goes back through the rate limiter.
+    """
+    session = requests.Session()
+    session.headers.update({'Content-Type': 'application/json'})
+    retry = Retry(
+        total=3,
+        backoff_factor=0.3,
+        status_forcelist=[500, 502, 503, 504],
+        allowed_methods=frozenset(['POST']),
+        raise_on_status=False  # Hand the last response to raise_for_status()
+    )
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, pool_block=True, max_retries=retry)
+    session.mount("https://", adapter)
+    return session
+
+_GROQ_SESSION = _create_groq_session()
+
+# Free-tier Groq quotas; raise them via the environment on paid plans
+GROQ_REQUESTS_PER_MINUTE = int(os.environ.get('GROQ_REQUESTS_PER_MINUTE', '30'))
+GROQ_TOKENS_PER_MINUTE = int(os.environ.get('GROQ_TOKENS_PER_MINUTE', '12000'))
+MAX_RATE_LIMIT_RETRIES = 3
+
+
+class GroqRateLimiter:
+    """
+    Thread-safe token buckets for Groq's requests-per-minute and
+    tokens-per-minute quotas. acquire() blocks until both have room,
+    so calls are paced up front instead of bouncing off 429s.
+    """
+    
+    def __init__(self, requests_per_minute: int = GROQ_REQUESTS_PER_MINUTE,
+                 tokens_per_minute: int = GROQ_TOKENS_PER_MINUTE):
+        self.max_requests = float(requests_per_minute)
+        self.max_tokens = float(tokens_per_minute)
+        self._requests = self.max_requests
+        self._tokens = self.max_tokens
+        self._refilled_at = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def acquire(self, tokens: int):
+        # A request larger than the whole bucket waits for a full bucket rather than forever
+        tokens = min(tokens, self.max_tokens)
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                elapsed_minutes = (now - self._refilled_at) / 60
+                self._refilled_at = now
+                self._requests = min(self.max_requests, self._requests + elapsed_minutes * self.max_requests)
+                self._tokens = min(self.max_tokens, self._tokens + elapsed_minutes * self.max_tokens)
+                if self._requests >= 1 and self._tokens >= tokens:
+                    self._requests -= 1
+                    self._tokens -= tokens
+                    return
+                wait = 60 * max((1 - self._requests) / self.max_requests,
+                                (tokens - self._tokens) / self.max_tokens)
+            time.sleep(wait)
+
+_GROQ_RATE_LIMITER = GroqRateLimiter()
+
+
+LLM_MAX_PAPERS = 15  # Papers per scoring prompt, to stay within token limits
+EMBEDDING_BATCH_SIZE = 32
+EMBEDDING_CACHE_TTL = 30 * 24 * 60 * 60  # A paper's embedding only changes with the model, which is in the key
+
+
 class SemanticEngine:
     """
-    Ranks papers by semantic relevance to a query using Groq LLM.
-    This provides a smarter ranking than keyword matching.
+    Ranks papers by semantic relevance to a query using local sentence
+    embeddings and/or the Groq LLM, with keyword matching as a fallback.
     """
     
     def __init__(self, groq_api_key: str = None):
         self.api_key = groq_api_key or os.environ.get('GROQ_API_KEY', '')
         self.api_url = "https://api.groq.com/openai/v1/chat/completions"
-        self.model = "llama-3.3-70b-versatile"
+        # Scoring is short classification, so it runs on the small fast model;
+        # standalone explanations get the large one
+        self.score_model = "llama-3.1-8b-instant"
+        self.explain_model = "llama-3.3-70b-versatile"
+        self.cache = get_cache('semantic_engine', ttl=LLM_CACHE_TTL)
+        self.session = _GROQ_SESSION
+        self.limiter = _GROQ_RATE_LIMITER
+        self.embedding_cache = get_cache('embeddings', ttl=EMBEDDING_CACHE_TTL)
+        self._query_words_cache = (None, frozenset())  # (query, its lowercased word set)
+    
+    @staticmethod
+    def _cache_key(kind: str, model: str, *parts: str) -> str:
+        return hashlib.sha256('|'.join((kind, model) + parts).encode('utf-8')).hexdigest()
+    
+    def _chat(self, payload: Dict, timeout: float, stop_at_json_end: bool = False) -> str:
+        """
+        POST a chat completion once the rate limiter allows it and return the message text.
+        429s are retried after the server's Retry-After delay. With stop_at_json_end the
+        reply is streamed and the connection dropped as soon as the JSON object closes.
+        """
+        headers = {
+            'Authorization': f'Bearer {self.api_key}',
+            'Content-Type': 'application/json'
+        }
+        # Rough token estimate: ~4 characters per prompt token plus the completion budget
+        estimated_tokens = sum(len(m['content']) for m in payload['messages']) // 4 + payload['max_tokens']
+        if stop_at_json_end:
+            payload = {**payload, 'stream': True}
+        
+        body = _json_dumps(payload)
+        
+        for attempt in range(MAX_RATE_LIMIT_RETRIES + 1):
+            self.limiter.acquire(estimated_tokens)
+            response = self.session.post(self.api_url, headers=headers, data=body, timeout=timeout,
+                                         stream=stop_at_json_end)
+            if response.status_code != 429 or attempt == MAX_RATE_LIMIT_RETRIES:
+                break
+            response.close()
+            try:
+                delay = float(response.headers.get('Retry-After', ''))
+            except ValueError:
+                delay = 2 ** attempt
+            logger.info(f"[SemanticEngine] Rate limited by Groq, retrying in {delay:.1f}s")
+            time.sleep(delay)
+        
+        with response:
+            response.raise_for_status()
+            if stop_at_json_end:
+                return read_streamed_json(response).strip()
+            return _json_loads(response.content)['choices'][0]['message']['content'].strip()
     
     def rank_papers(self, query: str, papers: List[Dict], top_k: int = 10) -> List[Dict]:
         """
         Rank papers by semantic relevance to the query.
         
-        Uses LLM to score each paper's relevance to the research topic.
-        Falls back to simple scoring if LLM unavailable.
+        Uses local embeddings and the LLM to score each paper's relevance to
+        the research topic. Falls back to simple scoring if neither is available.
         """
         
         if not papers:
@@ -44,143 +196,246 @@ class SemanticEngine:
         return scored[:top_k]
     
     def _score_papers(self, query: str, papers: List[Dict]) -> List[Dict]:
-        """Score each paper's relevance to the query."""
+        """
+        Score each paper's relevance to the query.
+        
+        Local embeddings (when sentence-transformers is installed) score every
+        paper cheaply; the LLM then re-scores the best LLM_MAX_PAPERS of them and
+        adds a one-sentence reason to each. Keyword scoring is the last resort.
+        
+        When the LLM scores, only the papers it saw are returned: scores from
+        different scorers are not comparable, so the rest cannot be ranked
+        against them.
+        """
+        
+        embedded = self._embed_score_papers(query, papers)
+        if embedded:
+            # The LLM sees the embedding shortlist rather than the first papers ArXiv returned
+            papers.sort(key=lambda x: x['score'], reverse=True)
         
-        # Try LLM-based scoring first
         if self.api_key:
+            shortlist = papers[:LLM_MAX_PAPERS]
             try:
-                return self._llm_score_papers(query, papers)
+                return self._llm_score_papers(query, shortlist)
             except Exception as e:
                 logger.warning(f"[SemanticEngine] LLM scoring failed, using fallback: {e}")
         
+        if embedded:
+            return papers
+        
         # Fallback to simple keyword scoring
         return self._keyword_score_papers(query, papers)
     
+    def _embed_score_papers(self, query: str, papers: List[Dict]) -> bool:
+        """Score papers by embedding cosine similarity to the query; False if no local model"""
+        
+        embedder = get_embedder()
+        if embedder is None:
+            return False
+        
+        # Papers seen in earlier searches reuse their stored embedding
+        cache_keys = [f"{EMBEDDING_MODEL_NAME}:int8:{p['arxiv_id']}" if p.get('arxiv_id') else None for p in papers]
+        vectors = [self._cached_embedding(key) if key else None for key in cache_keys]
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        
+        texts = [query] + [
+            f"{papers[i].get('title', '')} {papers[i].get('abstract_short') or papers[i].get('abstract', '')[:500]}"
+            for i in missing
+        ]
+        try:
+            encoded = embedder.encode(texts, normalize_embeddings=True, batch_size=EMBEDDING_BATCH_SIZE)
+        except Exception as e:
+            logger.warning(f"[SemanticEngine] Embedding scoring failed: {e}")
+            return False
+        
+        for i, vector in zip(missing, encoded[1:]):
+            vectors[i] = vector
+            if cache_keys[i]:
+                self.embedding_cache.set(cache_keys[i], self._quantize(vector))
+        
+        similarities = np.asarray(vectors, dtype=np.float32) @ encoded[0]
+        for paper, similarity in zip(papers, similarities.tolist()):
+            paper['score'] = max(0.0, similarity)
+        return True
+    
+    def _cached_embedding(self, key: str):
+        stored = self.embedding_cache.get(key)
+        if stored is None:
+            return None
+        scale, data = stored
+        return np.frombuffer(base64.b64decode(data), dtype=np.int8).astype(np.float32) * scale
+    
+    @staticmethod
+    def _quantize(vector) -> List:
+        """
+        Symmetric int8 quantization with one scale per vector: a quarter of the
+        float32 size, and the error is far below ranking noise for unit vectors.
+        """
+        scale = float(np.abs(vector).max()) / 127 or 1.0
+        quantized = np.round(vector / scale).astype(np.int8)
+        return [scale, base64.b64encode(quantized.tobytes()).decode('ascii')]
+    
     def _llm_score_papers(self, query: str, papers: List[Dict]) -> List[Dict]:
-        """Use LLM to score paper relevance."""
+        """
+        Use LLM to score paper relevance. The same call returns a one-sentence
+        relevance reason per paper, so no per-paper explanation request is needed.
+        """
         
         # Format papers for LLM
         paper_list = []
-        for i, p in enumerate(papers[:15]):  # Limit to avoid token limits
-            paper_list.append(f"{i+1}. \"{p.get('title', 'Unknown')}\"")
+        for i, p in enumerate(papers[:LLM_MAX_PAPERS]):  # Limit to avoid token limits
+            title = p.get('title', 'Unknown')[:120].replace('"', '')
+            paper_list.append(f"{i+1}. \"{title}\"\n   {p.get('abstract', '')[:200]}")
         
-        prompt = f"""You are a research paper relevance scorer. Given a research topic and a list of paper titles, rate each paper's relevance to the topic.
+        prompt = f"""You are a research paper relevance scorer. Given a research topic and a list of papers (title and start of abstract), rate each paper's relevance to the topic.
 
 Research Topic: {query}
 
 Papers:
 {chr(10).join(paper_list)}
 
-For each paper, provide a relevance score from 0.0 to 1.0 where:
-- 1.0 = Directly addresses the core topic
-- 0.7-0.9 = Highly relevant, addresses key aspects
-- 0.4-0.6 = Moderately relevant, touches on related concepts
-- 0.1-0.3 = Tangentially related
-- 0.0 = Not relevant
+For each paper, provide an integer relevance score from 0 to 10 where:
+- 10 = Directly addresses the core topic
+- 7-9 = Highly relevant, addresses key aspects
+- 4-6 = Moderately relevant, touches on related concepts
+- 1-3 = Tangentially related
+- 0 = Not relevant
 
-Return ONLY a JSON array of scores in order, like: [0.95, 0.72, 0.45, ...]
-No explanation, just the array."""
+Also give a one-sentence reason explaining why the paper is relevant to the topic.
+
+Return ONLY a JSON object with one entry per paper, where "i" is the paper number, "s" the score and "r" the reason, like:
+{{"papers": [{{"i": 1, "s": 9, "r": "..."}}, {{"i": 2, "s": 7, "r": "..."}}]}}"""
+
+        # The prompt covers the query and every paper, so it fully determines the answer
+        cache_key = self._cache_key('scores', self.score_model, prompt)
+        entries = self.cache.get(cache_key)
+        if entries is not None:
+            self._apply_scores(papers, entries)
+            return papers
 
-        headers = {
-            'Authorization': f'Bearer {self.api_key}',
-            'Content-Type': 'application/json'
-        }
-        
         payload = {
-            'model': self.model,
+            'model': self.score_model,
             'messages': [{'role': 'user', 'content': prompt}],
             'temperature': 0.1,
-            'max_tokens': 200
+            # No response_format: Groq's JSON mode can't be streamed, and the
+            # end-of-object detector plus JSON extraction cover for it
+            'max_tokens': 50 * len(paper_list) + 20  # Room for a short reason per paper
         }
         
-        response = requests.post(self.api_url, headers=headers, json=payload, timeout=30)
-        response.raise_for_status()
-        
-        result = response.json()['choices'][0]['message']['content'].strip()
+        result = self._chat(payload, timeout=30, stop_at_json_end=True)
         
-        # Parse scores
-        import json
+        # Parse scores (orjson's decode error subclasses json.JSONDecodeError)
+        match = _JSON_OBJECT_RE.search(result)
         try:
-            # Clean the response
-            result = result.replace('```json', '').replace('```', '').strip()
-            scores = json.loads(result)
-            
-            # Apply scores to papers
-            for i, paper in enumerate(papers[:len(scores)]):
-                paper['score'] = scores[i] if i < len(scores) else 0.5
-                
-            # Score remaining papers with 0.5 default
-            for paper in papers[len(scores):]:
-                paper['score'] = 0.5
-                
-        except json.JSONDecodeError:
-            logger.warning("[SemanticEngine] Failed to parse LLM scores")
-            return self._keyword_score_papers(query, papers)
+            entries = _json_loads(match.group(0) if match else result)['papers']
+        except (json.JSONDecodeError, KeyError, TypeError):
+            raise ValueError("Failed to parse LLM scores")
+        # A wrong shape would parse fine yet leave every paper on the default score, for as long as it's cached
+        if not isinstance(entries, list) or not entries or not all(
+            isinstance(entry, dict) and isinstance(entry.get('i'), int) for entry in entries
+        ):
+            raise ValueError("LLM scores are not a list of numbered entries")
         
+        self.cache.set(cache_key, entries)
+        self._apply_scores(papers, entries)
         return papers
     
+    @staticmethod
+    def _apply_scores(papers: List[Dict], entries: List[Dict]):
+        # Entries carry their 1-based paper number, so skipped or reordered ones still line up
+        by_number = {}
+        for entry in entries:
+            if isinstance(entry, dict) and isinstance(entry.get('i'), int):
+                by_number[entry['i']] = entry
+        
+        # Scores come back as integers 0-10; papers the model did not score get the 0.5 default
+        for number, paper in enumerate(papers, start=1):
+            entry = by_number.get(number, {})
+            score = entry.get('s')
+            paper['score'] = min(max(score, 0), 10) / 10 if isinstance(score, (int, float)) else 0.5
+            if entry.get('r'):
+                paper['relevance_reason'] = entry['r']
+    
     def _keyword_score_papers(self, query: str, papers: List[Dict]) -> List[Dict]:
-        """Simple keyword-based scoring as fallback."""
+        """
+        Simple keyword-based scoring as fallback.
+        Query words are IDF-weighted over the candidate set, so a rare term
+        matching counts for more than one every paper contains.
+        """
         
-        query_words = set(query.lower().split())
+        query_words = self._query_words(query)
+        if not query_words:
+            for paper in papers:
+                paper['score'] = 0.5
+            return papers
         
+        # Tokenize each paper once: (title words, title + abstract words)
+        tokenized = []
         for paper in papers:
             title = paper.get('title', '').lower()
             abstract = paper.get('abstract', '').lower()
-            
-            # Combine text
-            text = title + ' ' + abstract
-            text_words = set(text.split())
-            
-            # Calculate overlap
-            overlap = len(query_words & text_words)
-            max_possible = len(query_words)
-            
-            # Bonus for title matches
             title_words = set(title.split())
-            title_overlap = len(query_words & title_words)
-            
-            # Calculate score
-            if max_possible > 0:
-                base_score = overlap / max_possible
-                title_bonus = (title_overlap / max_possible) * 0.3
-                paper['score'] = min(1.0, base_score * 0.7 + title_bonus + 0.1)
-            else:
-                paper['score'] = 0.5
+            tokenized.append((title_words, title_words | set(abstract.split())))
+        
+        # Smoothed inverse document frequency of each query word
+        doc_freq = Counter(word for _, text_words in tokenized for word in query_words & text_words)
+        idf = {word: math.log((1 + len(papers)) / (1 + doc_freq[word])) + 1 for word in query_words}
+        max_possible = sum(idf.values())
+        
+        for paper, (title_words, text_words) in zip(papers, tokenized):
+            # Calculate weighted overlap, with a bonus for title matches
+            base_score = sum(idf[word] for word in query_words & text_words) / max_possible
+            title_bonus = sum(idf[word] for word in query_words & title_words) / max_possible * 0.3
+            paper['score'] = min(1.0, base_score * 0.7 + title_bonus + 0.1)
         
         return papers
     
-    def compute_relevance_explanation(self, query: str, paper: Dict) -> str:
-        """Generate a brief explanation of why a paper is relevant."""
+    def _query_words(self, query: str) -> frozenset:
+        # The same query is scored repeatedly (retries, fallbacks), so keep its last tokenization
+        cached_query, words = self._query_words_cache
+        if cached_query != query:
+            words = frozenset(query.lower().split())
+            self._query_words_cache = (query, words)
+        return words
+    
+    def compute_relevance_explanation(self, query: str, paper: Dict, model: Optional[str] = None) -> str:
+        """
+        Generate a brief explanation of why a paper is relevant.
+        Only needed for papers that LLM scoring did not already explain.
+        Uses explain_model unless another model is given.
+        """
         
         if not self.api_key:
             return "Paper matches search criteria based on title and abstract content."
         
+        model = model or self.explain_model
+        
+        title = paper.get('title', 'Unknown')
+        abstract = paper.get('abstract', '')[:500]
+        cache_key = self._cache_key('explanation', model, query, title, abstract)
+        explanation = self.cache.get(cache_key)
+        if explanation is not None:
+            return explanation
+        
         prompt = f"""In one sentence, explain why this paper is relevant to the research topic.
 
 Topic: {query}
-Paper Title: {paper.get('title', 'Unknown')}
-Abstract: {paper.get('abstract', '')[:500]}
+Paper Title: {title}
+Abstract: {abstract}
 
 Response (one sentence only):"""
 
         try:
-            headers = {
-                'Authorization': f'Bearer {self.api_key}',
-                'Content-Type': 'application/json'
-            }
-            
             payload = {
-                'model': self.model,
+                'model': model,
                 'messages': [{'role': 'user', 'content': prompt}],
                 'temperature': 0.3,
                 'max_tokens': 100
             }
             
-            response = requests.post(self.api_url, headers=headers, json=payload, timeout=15)
-            response.raise_for_status()
-            
-            return response.json()['choices'][0]['message']['content'].strip()
+            explanation = self._chat(payload, timeout=15)
+            self.cache.set(cache_key, explanation)
+            return explanation
             
         except Exception as e:
             logger.debug(f"[SemanticEngine] Explanation generation failed: {e}")
@@ -4,18 +4,71 @@
 
 import logging
 import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
 from typing import List, Dict, Optional
 from services.api_wrapper import ArxivWrapper, SemanticScholarWrapper
 from services.semantic_engine import SemanticEngine
 
 logger = logging.getLogger(__name__)
 
+ABSTRACT_PREVIEW_CHARS = 500
+
+
+_NON_WORD_RE = re.compile(r'\W+')
+
+
+def _dedupe_papers(papers: List[Dict]) -> List[Dict]:
+    """
+    Drop repeated versions and cross-listings of the same paper, matched on
+    normalized title. The newest copy is kept, at the first copy's position.
+    """
+    kept: Dict[str, int] = {}
+    unique: List[Dict] = []
+    for paper in papers:
+        key = _NON_WORD_RE.sub('', paper.get('title', '').lower())[:80]
+        if not key:
+            unique.append(paper)
+        elif key not in kept:
+            kept[key] = len(unique)
+            unique.append(paper)
+        elif (paper.get('published_date') or '') > (unique[kept[key]].get('published_date') or ''):
+            unique[kept[key]] = paper
+    return unique
+
+
+def _days_since(pub_date: Optional[str], today: date) -> Optional[int]:
+    """Age in days of a YYYY-MM-DD date, or None if missing or malformed"""
+    if not pub_date:
+        return None
+    try:
+        return (today - date.fromisoformat(pub_date)).days
+    except ValueError:
+        return None
+
+
+def _recency_score(days_old: Optional[int]) -> float:
+    if days_old is None:
+        return 0.5
+    if days_old < 180:  # < 6 months
+        return 1.0
+    if days_old < 365:  # < 1 year
+        return 0.9
+    if days_old < 730:  # < 2 years
+        return 0.7
+    return max(0.3, 1.0 - (days_old / 3650))  # Decay over 10 years
+
+
 class SOTAIdentifier:
     """
     Identifies top-K SOTA papers for a given research topic.
     Uses ArXiv search + Semantic Scholar metrics + LLM-based ranking.
     """
 
+    MAX_EXPLANATION_WORKERS = 8
+    LARGE_MODEL_MAX_TOP_K = 3
+
     def __init__(self, groq_api_key: str = None):
         self.arxiv_api = ArxivWrapper()
         self.semantic_scholar_api = SemanticScholarWrapper()
@@ -97,32 +150,64 @@ class SOTAIdentifier:
             logger.warning("[SOTA] No papers found on ArXiv")
             return result
 
+        # Duplicates would only cost extra scoring tokens and crowd out other papers
+        arxiv_results = _dedupe_papers(arxiv_results)
         result["total_found"] = len(arxiv_results)
+
+        # Truncate abstracts once; the ranking output and explanations only use this form
+        for paper in arxiv_results:
+            abstract = paper.get('abstract', '')
+            paper['abstract_short'] = abstract[:ABSTRACT_PREVIEW_CHARS] + '...' if len(abstract) > ABSTRACT_PREVIEW_CHARS else abstract
         logger.info(f"[SOTA] Found {len(arxiv_results)} candidate papers")
 
-        # ---- Step 2: Semantic ranking ----
-        logger.info("[SOTA] Step 2: Ranking papers by semantic relevance...")
-        ranked_papers = self.semantic_engine.rank_papers(
-            topic, 
-            arxiv_results, 
-            top_k=min(top_k * 2, len(arxiv_results))  # Get more than needed for filtering
-        )
+        # ---- Steps 2 + 3: Semantic ranking, overlapped with Semantic Scholar metrics ----
+        # Metrics only need arXiv IDs, so every candidate is looked up (one batch request)
+        # while ranking runs. The lookup fills stub dicts so the two steps never share a list.
+        # Rate-limited single lookups are too slow for every candidate: if the batch request
+        # fails, they are made afterwards for the ranked shortlist only.
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            metrics_future = None
+            if include_metrics:
+                logger.info("[SOTA] Step 3: Fetching citation metrics in the background...")
+                metrics_future = executor.submit(
+                    self.semantic_scholar_api.enrich_papers,
+                    [{'arxiv_id': paper.get('arxiv_id')} for paper in arxiv_results],
+                    single_fallback=False
+                )
 
-        # ---- Step 3: Enrich with Semantic Scholar metrics ----
-        if include_metrics:
-            logger.info("[SOTA] Step 3: Fetching citation metrics...")
-            ranked_papers = self.semantic_scholar_api.enrich_papers(ranked_papers[:top_k * 2])
+            logger.info("[SOTA] Step 2: Ranking papers by semantic relevance...")
+            ranked_papers = self.semantic_engine.rank_papers(
+                topic, 
+                arxiv_results, 
+                top_k=min(top_k * 2, len(arxiv_results))  # Get more than needed for filtering
+            )
+
+            if metrics_future is not None:
+                metrics_by_id = {stub.pop('arxiv_id'): stub for stub in metrics_future.result()}
+                for paper in ranked_papers:
+                    paper.update(metrics_by_id.get(paper.get('arxiv_id'), {}))
+                # Cache hits after a successful batch; single requests for the shortlist if it failed
+                self.semantic_scholar_api.enrich_papers(ranked_papers)
 
         # ---- Step 4: Final ranking and selection ----
         logger.info("[SOTA] Step 4: Computing final scores and selecting top papers...")
         final_papers = self._compute_final_ranking(ranked_papers, topic, top_k)
 
-        # ---- Step 5: Generate relevance explanations ----
-        logger.info("[SOTA] Step 5: Generating relevance explanations...")
-        for paper in final_papers:
-            paper['relevance_reason'] = self.semantic_engine.compute_relevance_explanation(
-                topic, paper
-            )
+        # ---- Step 5: Fill in missing relevance explanations ----
+        # LLM scoring already returns a reason per paper; only keyword-scored papers need a request
+        unexplained = [paper for paper in final_papers if not paper.get('relevance_reason')]
+        if unexplained:
+            logger.info(f"[SOTA] Step 5: Generating {len(unexplained)} relevance explanations...")
+            # Each explanation is an independent Groq round trip, so issue them concurrently
+            with ThreadPoolExecutor(max_workers=min(self.MAX_EXPLANATION_WORKERS, len(unexplained))) as executor:
+                # The large model is only worth its latency and TPM cost for a handful of papers
+                model = None if top_k <= self.LARGE_MODEL_MAX_TOP_K else self.semantic_engine.score_model
+                reasons = executor.map(
+                    lambda paper: self.semantic_engine.compute_relevance_explanation(topic, paper, model),
+                    unexplained
+                )
+                for paper, reason in zip(unexplained, reasons):
+                    paper['relevance_reason'] = reason
 
         result["sota_papers"] = final_papers
         logger.info(f"[SOTA] Successfully identified top-{len(final_papers)} SOTA papers")
@@ -133,8 +218,7 @@ class SOTAIdentifier:
         """
         Compute final ranking combining relevance, citations, and recency.
         """
-        from datetime import datetime
-        
+        today = date.today()
         scored_papers = []
         
         for paper in papers:
@@ -142,26 +226,11 @@ class SOTAIdentifier:
             relevance_score = paper.get('score', 0.5)
             
             # Compute citation score (normalized)
-            citation_count = paper.get('citation_count', 0)
-            citation_score = min(1.0, citation_count / 500) if citation_count else 0
+            citation_count = paper.get('citation_count', 0) or 0
+            citation_score = min(1.0, citation_count / 500)
             
             # Compute recency score (papers from last 2 years get higher score)
-            recency_score = 0.5
-            pub_date = paper.get('published_date')
-            if pub_date:
-                try:
-                    pub = datetime.strptime(pub_date, '%Y-%m-%d')
-                    days_old = (datetime.now() - pub).days
-                    if days_old < 180:  # < 6 months
-                        recency_score = 1.0
-                    elif days_old < 365:  # < 1 year
-                        recency_score = 0.9
-                    elif days_old < 730:  # < 2 years
-                        recency_score = 0.7
-                    else:
-                        recency_score = max(0.3, 1.0 - (days_old / 3650))  # Decay over 10 years
-                except ValueError:
-                    pass
+            recency_score = _recency_score(_days_since(paper.get('published_date'), today))
             
             # Compute final composite score
             # Weights: Relevance (50%), Citations (25%), Recency (25%)
@@ -176,7 +245,7 @@ class SOTAIdentifier:
                 "paper_id": paper.get('paper_id'),
                 "arxiv_id": paper.get('arxiv_id'),
                 "title": paper.get('title'),
-                "abstract": paper.get('abstract', '')[:500] + '...' if len(paper.get('abstract', '')) > 500 else paper.get('abstract', ''),
+                "abstract": paper.get('abstract_short', ''),
                 "authors": paper.get('authors', [])[:5],  # Limit authors
                 "url": paper.get('url'),
                 "pdf_url": paper.get('pdf_url'),
@@ -190,7 +259,8 @@ class SOTAIdentifier:
                     "reference_count": paper.get('reference_count', 0),
                     "recency_score": round(recency_score, 2),
                     "citation_score": round(citation_score, 2)
-                }
+                },
+                "relevance_reason": paper.get('relevance_reason')
             })
         
         # Sort by final score
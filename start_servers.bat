@@ -7,7 +7,7 @@ echo.
 :: Check if Python is available
 where python >nul 2>nul
 if %errorlevel% neq 0 (
-    echo ❌ Python not found. Please install Python 3.8+
+    echo ❌ Python not found. Please install Python 3.9+
     pause
     exit /b 1
 )
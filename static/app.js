@@ -0,0 +1,134 @@
+document.getElementById('uploadForm').addEventListener('submit', async (e) => {
+    e.preventDefault();
+
+    const formData = new FormData(e.target);
+    const submitBtn = document.getElementById('submitBtn');
+    const resultsDiv = document.getElementById('results');
+
+    submitBtn.disabled = true;
+    submitBtn.textContent = '⏳ Processing...';
+    resultsDiv.innerHTML = '<div class="loading"><div class="spinner"></div>Running research pipeline... This may take 2-3 minutes.</div>';
+
+    try {
+        const response = await fetch('/analyze', {
+            method: 'POST',
+            body: formData
+        });
+
+        const data = await response.json();
+
+        if (data.error) {
+            resultsDiv.innerHTML = `<div class="result-section" style="border-left-color: #ff6b6b;"><h3>❌ Error</h3><p>${data.error}</p></div>`;
+        } else {
+            displayResults(data);
+        }
+    } catch (error) {
+        resultsDiv.innerHTML = `<div class="result-section" style="border-left-color: #ff6b6b;"><h3>❌ Error</h3><p>${error.message}</p></div>`;
+    } finally {
+        submitBtn.disabled = false;
+        submitBtn.textContent = '🚀 Analyze & Synthesize';
+    }
+});
+
+function displayResults(data) {
+    const resultsDiv = document.getElementById('results');
+
+    let html = '<h2 style="margin-bottom: 20px;">📊 Analysis Results</h2>';
+
+    // Paper summaries
+    html += `
+        <div class="result-section">
+            <h3>📄 Paper A: ${data.paper_a.title || 'Unknown'}</h3>
+        </div>
+
+        <div class="result-section">
+            <h3>📄 Paper B: ${data.paper_b.title || 'Unknown'}</h3>
+        </div>
+    `;
+
+    // Weaknesses
+    html += `
+        <div class="result-section">
+            <h3>⚠️ Weaknesses of Paper A</h3>
+            <ul class="weakness-list">
+                ${data.weaknesses_a.map(w => `<li>${w}</li>`).join('')}
+            </ul>
+        </div>
+
+        <div class="result-section">
+            <h3>⚠️ Weaknesses of Paper B</h3>
+            <ul class="weakness-list">
+                ${data.weaknesses_b.map(w => `<li>${w}</li>`).join('')}
+            </ul>
+        </div>
+    `;
+
+    // Weakness Analysis
+    const analysis = data.weakness_analysis;
+    html += `
+        <div class="result-section">
+            <h3>🔄 Weakness Pattern Analysis</h3>
+            <p><strong>Shared weaknesses:</strong></p>
+            <ul class="weakness-list">
+                ${analysis.shared.map(w => `<li>${w}</li>`).join('') || '<li>None identified</li>'}
+            </ul>
+            <p style="margin-top: 15px;"><strong>Unique to Paper A:</strong></p>
+            <ul class="weakness-list">
+                ${analysis.paper_a_only.map(w => `<li>${w}</li>`).join('') || '<li>None identified</li>'}
+            </ul>
+            <p style="margin-top: 15px;"><strong>Unique to Paper B:</strong></p>
+            <ul class="weakness-list">
+                ${analysis.paper_b_only.map(w => `<li>${w}</li>`).join('') || '<li>None identified</li>'}
+            </ul>
+        </div>
+    `;
+
+    // Proposed Method
+    const method = data.proposed_method;
+    html += `
+        <div class="proposed-method">
+            <h2>💡 ${method.method_name}</h2>
+            <p style="margin: 15px 0; line-height: 1.6;"><strong>Core Idea:</strong> ${method.core_idea}</p>
+            <p><strong>Key Components:</strong></p>
+            <ul class="component-list">
+                ${method.components.map(c => `<li>${c}</li>`).join('')}
+            </ul>
+            <p style="margin-top: 15px; line-height: 1.6;"><strong>Addresses Weaknesses:</strong> ${method.addresses_weaknesses}</p>
+        </div>
+    `;
+
+    // Comparison Table
+    html += `
+        <div class="result-section">
+            <h3>📊 Comparative Analysis</h3>
+            <table>
+                <thead>
+                    <tr>
+                        <th>Aspect</th>
+                        <th>Paper A</th>
+                        <th>Paper B</th>
+                        <th>Proposed Method</th>
+                    </tr>
+                </thead>
+                <tbody>
+    `;
+
+    for (const [aspect, values] of Object.entries(data.comparison_table)) {
+        html += `
+            <tr>
+                <td><strong>${aspect}</strong></td>
+                <td>${values.paper_a || 'N/A'}</td>
+                <td>${values.paper_b || 'N/A'}</td>
+                <td>${values.proposed || 'N/A'}</td>
+            </tr>
+        `;
+    }
+
+    html += `
+                </tbody>
+            </table>
+        </div>
+    `;
+
+    resultsDiv.innerHTML = html;
+}